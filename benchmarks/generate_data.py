@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import random
+
+# The processed 320-record sample; its values seed the vocabularies and distributions below
+SAMPLE_FILE = os.path.join(os.path.dirname(__file__), '..', 'ingestion', 'src', 'json_100_100.json')
+
+# Share of records that use the camelCase aliases (firstName, jobTitle, experience, ...)
+CAMEL_CASE_RATIO = 0.1
+
+# Share of records with a broken field; the processors skip or default these
+BAD_ROW_RATIO = 0.01
+
+DEFAULT_SEED = 100
+
+
+class SampleProfile:
+
+    # Vocabularies and value ranges taken from the sample output file
+    def __init__(self, sample_file=SAMPLE_FILE):
+        with open(sample_file, 'r') as file:
+            records = json.load(file)["data"]
+        names = [record["full_name"].split(" ", 1) for record in records]
+        self.first_names = sorted({name[0] for name in names})
+        self.last_names = sorted({name[-1] for name in names})
+        self.genders = sorted({record["gender"] for record in records})
+        self.job_titles = sorted({record["job_title"] for record in records})
+        self.departments = [record["department"] for record in records]
+        self.salaries = sorted({record["salary"] for record in records})
+        self.ages = (min(record["age"] for record in records), max(record["age"] for record in records))
+        self.experience = (0, max(record["years_of_experience"] for record in records))
+        self.phones = [record["phone"] for record in records if record["phone"] != "Invalid Number"]
+        self.extension_ratio = sum(record["phone"] == "Invalid Number" for record in records) / len(records)
+
+
+def generate_records(count, seed=DEFAULT_SEED, profile=None):
+
+    # Deterministic raw API records: the same count and seed always give the same data
+    profile = profile or SampleProfile()
+    rng = random.Random(seed)
+    for employee_id in range(1, count + 1):
+        first_name = rng.choice(profile.first_names)
+        last_name = rng.choice(profile.last_names)
+        phone = rng.choice(profile.phones)
+        if rng.random() < profile.extension_ratio:
+            phone = f"{phone}x{rng.randint(100, 99999)}"
+        record = {
+            "id": employee_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": f"{first_name}{last_name}{employee_id}@example.com".lower(),
+            "phone": phone,
+            "gender": rng.choice(profile.genders),
+            "age": rng.randint(*profile.ages),
+            "job_title": rng.choice(profile.job_titles),
+            "years_of_experience": rng.randint(*profile.experience),
+            "salary": rng.choice(profile.salaries),
+            "department": rng.choice(profile.departments)
+        }
+        if rng.random() < CAMEL_CASE_RATIO:
+            record = camel_case(record)
+        if rng.random() < BAD_ROW_RATIO:
+            break_record(record, rng)
+        yield record
+
+def camel_case(record):
+
+    aliases = {"first_name": "firstName", "last_name": "lastName", "phone": "phoneNumber",
+               "job_title": "jobTitle", "years_of_experience": "experience"}
+    return {aliases.get(key, key): value for key, value in record.items()}
+
+def break_record(record, rng):
+
+    # One of the defects seen in real feeds: unparseable numbers, nulls, string salaries, missing fields
+    defect = rng.randrange(4)
+    if defect == 0:
+        record["age"] = "unknown"
+    elif defect == 1:
+        record["salary"] = None
+    elif defect == 2:
+        record["salary"] = f"{record['salary']}.50"
+    else:
+        record.pop("department", None)
+
+def write_api_response(path, count, seed=DEFAULT_SEED, batch_size=10000):
+
+    # Streams {"data": [...]} to disk, so even 10M records never sit in memory at once
+    profile = SampleProfile()
+    with open(path, 'w') as file:
+        file.write('{"data": [')
+        batch = []
+        first = True
+        for record in generate_records(count, seed, profile):
+            batch.append(json.dumps(record))
+            if len(batch) == batch_size:
+                file.write(("" if first else ",") + ",".join(batch))
+                first = False
+                batch = []
+        if batch:
+            file.write(("" if first else ",") + ",".join(batch))
+        file.write(']}')
+    return path
+
+def api_response_file(data_dir, count, seed=DEFAULT_SEED):
+
+    # Generated files are reused between benchmark runs
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"employees_{count}_{seed}.json")
+    if not os.path.exists(path):
+        write_api_response(f"{path}.tmp", count, seed)
+        os.replace(f"{path}.tmp", path)
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic employees API response")
+    parser.add_argument("count", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+    write_api_response(args.output, args.count, args.seed)
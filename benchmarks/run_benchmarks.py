@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from generate_data import DEFAULT_SEED, api_response_file
+from stub_server import serve_file
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+INGESTION_SRC = os.path.join(REPO_DIR, "ingestion", "src")
+PROCESS_DIR = os.path.join(REPO_DIR, "process")
+
+SCENARIOS = ("transform_json", "transform_parquet", "handler_json", "handler_parquet")
+DEFAULT_SCALES = [1000, 10000, 100000]
+DEFAULT_DATA_DIR = os.path.join(BENCHMARK_DIR, "data")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.jsonl")
+
+def import_processors():
+
+    # process/ is deployed into the lamda.process package next to the JSON processor
+    sys.path.insert(0, INGESTION_SRC)
+    sys.path.insert(0, PROCESS_DIR)
+    import lamda.process
+    if PROCESS_DIR not in lamda.process.__path__:
+        lamda.process.__path__.append(PROCESS_DIR)
+
+def peak_rss_mb():
+
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def output_bytes(work_dir):
+
+    total = 0
+    for root, _, files in os.walk(work_dir):
+        for name in files:
+            if name != "run_scraper.json":
+                total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def run_scenario(scenario, config, data_file, api_url, work_dir, warm=False):
+
+    # Runs inside a fresh child process, so peak RSS belongs to this scenario alone. Transforms
+    # are timed with their modules already imported; handlers are timed on their first (cold)
+    # call unless warm is set, in which case one untimed call runs first.
+    import_processors()
+    os.chdir(work_dir)
+    status = None
+    if scenario.startswith("transform"):
+        from lamda.process.field_mapping import find_employee_records
+        from lamda.process.json_processor import transform_employee_records
+        from lamda.process.parquet_processor import transform_and_save_to_parquet
+        import pyarrow.dataset
+        import pyarrow.parquet
+        with open(data_file, 'r') as file:
+            raw_data = json.load(file)
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        if scenario == "transform_json":
+            transform_employee_records(find_employee_records(raw_data), config.get("field_mapping"))
+        else:
+            transform_and_save_to_parquet(raw_data, os.path.join(work_dir, "bench_1.parquet"), config)
+    else:
+        with open("run_scraper.json", 'w') as file:
+            json.dump([dict(config, scraper_name="bench", api_url=api_url)], file)
+        if scenario == "handler_json":
+            from main import lambdaHandler
+        else:
+            from process_main import lambdaHandler
+        event = {"scraper_input": {"scraper_name": "bench", "run_scraper_id": "1"}}
+        if warm:
+            lambdaHandler(event, None)
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        status = lambdaHandler(event, None)["statusCode"]
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_before_mb": round(rss_before, 1),
+        "output_bytes": output_bytes(work_dir),
+        "status": status
+    }
+
+def run_in_subprocess(scenario, config, data_file, api_url, warm=False, verbose=False):
+
+    work_dir = tempfile.mkdtemp(prefix=f"bench_{scenario}_")
+    result_file = os.path.join(work_dir, "result.json.out")
+    try:
+        command = [sys.executable, os.path.abspath(__file__), "--child", scenario, "--config", json.dumps(config),
+                   "--data-file", data_file, "--api-url", api_url, "--work-dir", work_dir,
+                   "--result-file", result_file] + (["--warm"] if warm else [])
+        # The processors print per batch and per bad record; keep that out of the report
+        subprocess.run(command, check=True, stdout=None if verbose else subprocess.DEVNULL)
+        with open(result_file, 'r') as file:
+            return json.load(file)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def git_commit():
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def result_key(result):
+
+    return (result["scenario"], result["records"], json.dumps(result["config"], sort_keys=True),
+            result.get("warm", False))
+
+def load_previous_results(path):
+
+    # Most recent earlier result per scenario, scale and config
+    previous = {}
+    if os.path.exists(path):
+        with open(path, 'r') as file:
+            for line in file:
+                if line.strip():
+                    result = json.loads(line)
+                    previous[result_key(result)] = result
+    return previous
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark the employee processors on synthetic data")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)),
+                        help="comma-separated record counts, e.g. 1000,1000000,10000000")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--config", default="{}", help="JSON scraper config overrides, e.g. '{\"stream\": true}'")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--warm", action="store_true", help="time a second handler call instead of the cold first one")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--source", choices=("http", "file"), default="http",
+                        help="handlers read the generated data from the stub server or straight from disk")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON Lines file the results are appended to")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    config = json.loads(args.config)
+    scenarios = args.scenarios.split(",")
+    unknown = [scenario for scenario in scenarios if scenario not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {unknown}")
+    previous = load_previous_results(args.output)
+    run_info = {"timestamp": datetime.now().isoformat(), "commit": git_commit(),
+                "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+    print(f"{'scenario':<18} {'records':>10} {'seconds':>9} {'records/s':>11} {'peak MB':>9} {'output MB':>10} {'vs last':>8}")
+    with open(args.output, 'a') as output:
+        for records in map(int, args.scales.split(",")):
+            data_file = api_response_file(args.data_dir, records, args.seed)
+            scale_config = dict(config, source="file", source_path=data_file) if args.source == "file" else config
+            with serve_file(data_file) as api_url:
+                for scenario in scenarios:
+                    for _ in range(args.repeat):
+                        measured = run_in_subprocess(scenario, scale_config, data_file, api_url, args.warm, args.verbose)
+                        result = dict(run_info, scenario=scenario, records=records, config=scale_config, warm=args.warm,
+                                      **measured)
+                        result["records_per_second"] = round(records / measured["seconds"]) if measured["seconds"] else None
+                        output.write(json.dumps(result) + "\n")
+                        output.flush()
+
+                        last = previous.get(result_key(result))
+                        change = f"{last['seconds'] / measured['seconds']:.2f}x" if last and measured["seconds"] else "-"
+                        print(f"{scenario:<18} {records:>10} {measured['seconds']:>9.3f} {result['records_per_second'] or 0:>11} "
+                              f"{measured['peak_rss_mb']:>9.1f} {measured['output_bytes'] / 1e6:>10.2f} {change:>8}")
+
+def child_main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--child", required=True)
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--data-file", required=True)
+    parser.add_argument("--api-url", required=True)
+    parser.add_argument("--work-dir", required=True)
+    parser.add_argument("--result-file", required=True)
+    parser.add_argument("--warm", action="store_true")
+    args = parser.parse_args()
+    result = run_scenario(args.child, json.loads(args.config), args.data_file, args.api_url, args.work_dir,
+                          args.warm)
+    with open(args.result_file, 'w') as file:
+        json.dump(result, file)
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child_main()
+    else:
+        main()
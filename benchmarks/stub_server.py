@@ -0,0 +1,61 @@
+import hashlib
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Bytes copied from the data file to the socket per write
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def file_handler(path):
+
+    # ETag and Last-Modified let the handlers' conditional fetching be benchmarked too
+    stat = os.stat(path)
+    etag = '"' + hashlib.sha256(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16] + '"'
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+    class FileHandler(BaseHTTPRequestHandler):
+
+        # Keep-alive, so the pooled session of the handlers can reuse its connection
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(stat.st_size))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            with open(path, 'rb') as file:
+                try:
+                    shutil.copyfileobj(file, self.wfile, COPY_BUFFER_SIZE)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return FileHandler
+
+@contextmanager
+def serve_file(path):
+
+    # Serves path at http://127.0.0.1:<port>/employees.json until the block exits
+    server = ThreadingHTTPServer(("127.0.0.1", 0), file_handler(path))
+    thread = threading.Thread(target=server.serve_forever, name="stub-server", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/employees.json"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
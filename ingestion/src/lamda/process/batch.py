@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from .http_session import session_limits
+
+# Scrapers processed at the same time in one batch run
+DEFAULT_MAX_WORKERS = 8
+
+# Concurrent requests allowed against a single API host
+DEFAULT_MAX_PER_HOST = 4
+
+def select_scrapers(scraper_configs, scraper_names=None):
+
+    # Enabled scrapers in config order, or only the named ones; names that cannot run are
+    # returned with the reason, so the batch response accounts for every requested scraper.
+    # A name requested twice runs once, since both runs would write the same outputs.
+    by_name = {scraper_config.get("scraper_name"): scraper_config for scraper_config in scraper_configs}
+    selected = []
+    skipped = {}
+    for scraper_name in dict.fromkeys(scraper_names or by_name):
+        scraper_config = by_name.get(scraper_name)
+        if scraper_config is None:
+            skipped[scraper_name] = "Scraper configuration not found"
+        elif not scraper_config.get("enabled", True):
+            skipped[scraper_name] = "Scraper is disabled"
+        else:
+            selected.append(scraper_config)
+    return selected, skipped
+
+def run_batch(scraper_configs, run_scraper, max_workers=DEFAULT_MAX_WORKERS, max_per_host=DEFAULT_MAX_PER_HOST):
+
+    # Run run_scraper(scraper_config) for every scraper on a thread pool. Fetches overlap on the
+    # shared session, whose blocking per-host pools enforce max_per_host for the duration of the
+    # batch; transforms overlap with other scrapers' network time.
+    hosts = {urlsplit(scraper_config.get("api_url", "")).netloc for scraper_config in scraper_configs}
+
+    def run(scraper_config):
+        try:
+            return run_scraper(scraper_config)
+        except Exception as e:
+            print(f"Error in scraper {scraper_config.get('scraper_name')}: {str(e)}")
+            return {
+                "statusCode": 500,
+                "body": f"Error processing request: {str(e)}"
+            }
+
+    start = time.perf_counter()
+    with session_limits(max_per_host, hosts=len(hosts)):
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="scraper") as executor:
+            futures = [(scraper_config["scraper_name"], executor.submit(run, scraper_config))
+                       for scraper_config in scraper_configs]
+            results = {scraper_name: future.result() for scraper_name, future in futures}
+    return results, time.perf_counter() - start
+
+def batch_response(results, skipped, elapsed_seconds):
+
+    failed = [scraper_name for scraper_name, result in results.items() if result["statusCode"] != 200]
+    return {
+        # 207: some scrapers failed while others succeeded
+        "statusCode": 200 if not failed else (207 if len(failed) < len(results) else 500),
+        "body": f"Processed {len(results)} scrapers: {len(results) - len(failed)} succeeded, {len(failed)} failed",
+        "elapsed_seconds": round(elapsed_seconds, 4),
+        "failed": failed,
+        "skipped": skipped,
+        "results": results
+    }
@@ -0,0 +1,39 @@
+import json
+import os
+
+# Default scraper configuration file, relative to the handler's working directory
+CONFIG_FILE = "run_scraper.json"
+
+# Parsed configuration files kept across warm invocations:
+# path -> ((mtime_ns, size), {scraper_name: scraper_config})
+_config_index = {}
+
+def load_scraper_configs(path=CONFIG_FILE):
+
+    # Re-read the file only when its modification time or size has changed
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _config_index.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with open(path, 'r') as config_file:
+        scrapers = json.load(config_file)
+
+    # Index by scraper_name; the first entry wins, as with the original linear scan
+    index = {}
+    for scraper in scrapers:
+        index.setdefault(scraper.get("scraper_name"), scraper)
+    _config_index[path] = (version, index)
+    return index
+
+def get_scraper_config(scraper_name, path=CONFIG_FILE):
+
+    # Hand out a copy so a caller cannot change the cached configuration
+    scraper_config = load_scraper_configs(path).get(scraper_name)
+    return dict(scraper_config) if scraper_config is not None else None
+
+def list_scraper_configs(path=CONFIG_FILE):
+
+    # Copies of every configured scraper, in file order
+    return [dict(scraper_config) for scraper_config in load_scraper_configs(path).values()]
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import sqlite3
+from .field_mapping import DEFAULT_FIELD_MAPPING
+
+# Values of the "dedup" config key: drop duplicates, or keep them and only count them
+DROP = "drop"
+FLAG = "flag"
+
+# Record fields a duplicate can be detected on
+DEDUP_KEYS = ("employee_id", "email")
+
+# Duplicate statuses returned by DedupIndex.classify; None means the record is new
+DUPLICATE_IN_RUN = "duplicate_in_run"
+DUPLICATE_ACROSS_RUNS = "duplicate_across_runs"
+
+# Data quality checks counted for every written record
+VALIDATION_CHECKS = ("missing_employee_id", "invalid_phone", "missing_email", "missing_full_name", "zero_age",
+                     "zero_years_of_experience", "zero_salary")
+
+# SQLite page cache per index, in KiB; the index itself stays on disk however large it grows
+CACHE_SIZE_KIB = 65536
+
+# employee_id a record without an id is transformed to; it is counted, never used as a key
+MISSING_EMPLOYEE_ID = DEFAULT_FIELD_MAPPING["employee_id"]["default"]
+
+_KEY_KINDS = {"employee_id": 0, "email": 1}
+_INT64_MAX = 2 ** 63 - 1
+
+def dedup_settings(scraper_config):
+
+    # (index path, mode, keys), or None when the scraper does not deduplicate
+    mode = scraper_config.get("dedup", False)
+    if not mode:
+        return None
+    mode = DROP if mode is True else mode
+    if mode not in (DROP, FLAG):
+        raise ValueError(f"Unsupported dedup mode: {mode}")
+    keys = scraper_config.get("dedup_keys", list(DEDUP_KEYS))
+    unknown = [key for key in keys if key not in DEDUP_KEYS]
+    if unknown or not keys:
+        raise ValueError(f"dedup_keys must be taken from {list(DEDUP_KEYS)}, got {keys}")
+    default_path = f"{scraper_config.get('scraper_name', 'scraper')}_dedup.sqlite"
+    return scraper_config.get("dedup_index_path", default_path), mode, keys
+
+def id_keys(employee_ids):
+
+    # Ids are stored as SQLite integers; anything outside 64 bits is hashed like an email.
+    # A missing id never makes a record a duplicate, like a missing email.
+    return [None if employee_id == MISSING_EMPLOYEE_ID
+            else employee_id if -_INT64_MAX <= employee_id <= _INT64_MAX else text_key(str(employee_id))
+            for employee_id in employee_ids]
+
+def email_keys(emails):
+
+    # Emails compare case-insensitively; a missing email never makes a record a duplicate
+    return [text_key(email.strip().lower()) if email and email.strip() else None for email in emails]
+
+def text_key(text, blake2b=hashlib.blake2b, from_bytes=int.from_bytes):
+
+    # 64-bit digest, signed to fit an SQLite integer
+    return from_bytes(blake2b(text.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+def record_checks(records):
+
+    # Validation counts for transformed records, read by key so dicts work as well
+    counts = dict.fromkeys(VALIDATION_CHECKS, 0)
+    for record in records:
+        if record["employee_id"] == MISSING_EMPLOYEE_ID:
+            counts["missing_employee_id"] += 1
+        if record["phone"] == "Invalid Number":
+            counts["invalid_phone"] += 1
+        if not record["email"]:
+            counts["missing_email"] += 1
+        if not record["full_name"]:
+            counts["missing_full_name"] += 1
+        if record["age"] == 0:
+            counts["zero_age"] += 1
+        if record["years_of_experience"] == 0:
+            counts["zero_years_of_experience"] += 1
+        if record["salary"] == 0:
+            counts["zero_salary"] += 1
+    return counts
+
+def open_dedup_index(scraper_config, run_label):
+
+    settings = dedup_settings(scraper_config)
+    if settings is None:
+        return None
+    path, mode, keys = settings
+    # Delta mode has to see every id of the run, or an unchanged employee would read as deleted
+    return DedupIndex(path, run_label, mode, keys, keep_across_runs=bool(scraper_config.get("delta")))
+
+def dedup_records(records, index, stats):
+
+    # Drop or flag the duplicates of one transformed batch and count checks on what is kept
+    if not records:
+        return records
+    keep = index.apply({key: [record[key] for record in records] for key in index.keys}, stats)
+    if not all(keep):
+        records = [record for record, kept in zip(records, keep) if kept]
+    index.add_checks(record_checks(records))
+    return records
+
+
+class DedupIndex:
+
+    # Keys of every record written by earlier runs, kept in an SQLite table on disk. Each batch
+    # costs one indexed lookup and one insert statement per key kind, fed through json_each, so
+    # lookups stay O(1)-ish per record and only SQLite's page cache is held in memory.
+    #
+    # Keys are tagged with the run that first wrote them. run_label identifies the run (the
+    # output file); keys of runs that never committed, or of an earlier attempt at the same
+    # run, are discarded when a run starts, so reruns and failed runs drop nothing by mistake.
+    # With keep_across_runs, duplicates of earlier runs are only counted and stay in the output.
+    def __init__(self, path, run_label, mode=DROP, keys=DEDUP_KEYS, keep_across_runs=False):
+        self.path = path
+        self.mode = mode
+        self.keep_across_runs = keep_across_runs
+        # Keys of kept duplicates of earlier runs; the index only holds the run that first wrote
+        # a key, so a second copy within this run is caught here instead
+        self.carried_keys = [set() for _ in keys]
+        self.keys = list(keys)
+        self.kinds = [(key, _KEY_KINDS[key]) for key in keys]
+        self.checks = dict.fromkeys(VALIDATION_CHECKS, 0)
+        self.counts = {"unique": 0, DUPLICATE_IN_RUN: 0, DUPLICATE_ACROSS_RUNS: 0}
+
+        # The pipeline transforms on a worker thread; only one thread uses the index at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS runs "
+                                    "(run INTEGER PRIMARY KEY, label TEXT UNIQUE, committed INTEGER NOT NULL)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS seen_keys "
+                                    "(kind INTEGER, key INTEGER, run INTEGER, PRIMARY KEY (kind, key)) WITHOUT ROWID")
+            stale = "SELECT run FROM runs WHERE committed = 0 OR label = ?"
+            if self.connection.execute(stale, (run_label,)).fetchone():
+                self.connection.execute(f"DELETE FROM seen_keys WHERE run IN ({stale})", (run_label,))
+                self.connection.execute("DELETE FROM runs WHERE committed = 0 OR label = ?", (run_label,))
+            self.run = self.connection.execute("INSERT INTO runs (label, committed) VALUES (?, 0)",
+                                               (run_label,)).lastrowid
+
+    def lookup(self, kind, keys):
+        # Run that first wrote each key that is already in the index; the IN list is probed
+        # against the primary key, one lookup per key
+        if not keys:
+            return {}
+        return dict(self.connection.execute(
+            "SELECT key, run FROM seen_keys WHERE kind = ? AND key IN (SELECT value FROM json_each(?))",
+            (kind, json.dumps(keys))))
+
+    def classify(self, columns):
+        # columns maps each dedup key to its values for one batch. Returns a status per record
+        # and records the keys of the new ones.
+        record_keys = [id_keys(columns[key]) if key == "employee_id" else email_keys(columns[key])
+                       for key, _ in self.kinds]
+        present = [[key for key in keys if key is not None] for keys in record_keys]
+        found = [self.lookup(kind, keys) for (_, kind), keys in zip(self.kinds, present)]
+
+        # Usual case: nothing in the index and no repeats within the batch
+        if not any(found) and not any(self.carried_keys) and all(len(set(keys)) == len(keys) for keys in present):
+            statuses = [None] * len(record_keys[0])
+            new_keys = present
+        else:
+            statuses = []
+            new_keys = [[] for _ in self.kinds]
+            batch_keys = [set() for _ in self.kinds]
+            for keys in zip(*record_keys):
+                status = None
+                for key, seen, batch, carried in zip(keys, found, batch_keys, self.carried_keys):
+                    if key is None:
+                        continue
+                    run = seen.get(key)
+                    if key in batch or run == self.run or key in carried:
+                        status = DUPLICATE_IN_RUN
+                        break
+                    if run is not None:
+                        status = DUPLICATE_ACROSS_RUNS
+                if status is None:
+                    for key, new, batch in zip(keys, new_keys, batch_keys):
+                        if key is not None:
+                            new.append(key)
+                            batch.add(key)
+                elif status == DUPLICATE_ACROSS_RUNS and self.keep_across_runs:
+                    for key, carried in zip(keys, self.carried_keys):
+                        if key is not None:
+                            carried.add(key)
+                statuses.append(status)
+        self.counts["unique"] += statuses.count(None)
+        self.counts[DUPLICATE_IN_RUN] += statuses.count(DUPLICATE_IN_RUN)
+        self.counts[DUPLICATE_ACROSS_RUNS] += statuses.count(DUPLICATE_ACROSS_RUNS)
+
+        # Sorted keys append to the B-tree in order instead of splitting pages at random
+        for (_, kind), keys in zip(self.kinds, new_keys):
+            if keys:
+                self.connection.execute("INSERT INTO seen_keys (kind, key, run) SELECT ?, value, ? FROM json_each(?)",
+                                        (kind, self.run, json.dumps(sorted(keys))))
+        return statuses
+
+    def apply(self, columns, stats):
+        # Which records of the batch go to the output: all of them when duplicates are only
+        # flagged. Dropped duplicates are counted as skipped records under their status.
+        statuses = self.classify(columns)
+        if self.mode == FLAG:
+            return [True] * len(statuses)
+        dropped_statuses = (DUPLICATE_IN_RUN,) if self.keep_across_runs else (DUPLICATE_IN_RUN, DUPLICATE_ACROSS_RUNS)
+        for status in dropped_statuses:
+            dropped = statuses.count(status)
+            if dropped:
+                stats.skip(status, dropped)
+        return [status not in dropped_statuses for status in statuses]
+
+    def add_checks(self, counts):
+        for check, count in counts.items():
+            self.checks[check] += count
+
+    def summary(self, stats=None):
+        summary = dict(mode=self.mode, keys=[key for key, _ in self.kinds], keep_across_runs=self.keep_across_runs,
+                       **self.counts, **self.checks)
+        if stats is not None:
+            summary["invalid_records"] = {reason: count for reason, count in stats.skip_reasons.items()
+                                          if reason.startswith("invalid_")}
+        return summary
+
+    def save_pending(self):
+        # Keys are stored now, but only count for later runs once commit_dedup_index has run
+        self.connection.commit()
+        self.connection.close()
+
+    def abort(self):
+        self.connection.rollback()
+        self.connection.close()
+
+
+def commit_dedup_index(path, run_label):
+
+    # Called once the output file exists, like commit_fingerprint_index
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE runs SET committed = 1 WHERE label = ?", (run_label,))
+    connection.close()
@@ -0,0 +1,129 @@
+import hashlib
+import os
+from array import array
+
+# Values of the change_type column in delta output
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+def fingerprint_index_path(scraper_config):
+
+    # None means the scraper writes full snapshots instead of deltas
+    if not scraper_config.get("delta", False):
+        return None
+    default_path = f"{scraper_config.get('scraper_name', 'scraper')}_fingerprints.bin"
+    return scraper_config.get("fingerprint_index_path", default_path)
+
+def fingerprint(values):
+
+    # 64-bit digest of a transformed record's values, in output column order
+    return fingerprint_text("\x1f".join(map(str, values)))
+
+def fingerprint_text(text):
+
+    # Callers that can serialise rows in bulk (e.g. with pyarrow) hash the joined text directly
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+def load_fingerprint_index(path):
+
+    # The index is stored as a record count followed by two packed arrays (ids, fingerprints),
+    # 16 bytes per employee, so millions of ids load with a couple of bulk reads
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'rb') as index_file:
+        count = array("q")
+        count.fromfile(index_file, 1)
+        ids = array("q")
+        ids.fromfile(index_file, count[0])
+        fingerprints = array("Q")
+        fingerprints.fromfile(index_file, count[0])
+    return dict(zip(ids, fingerprints))
+
+def write_fingerprint_index(path, index):
+
+    with open(path, 'wb') as index_file:
+        array("q", [len(index)]).tofile(index_file)
+        array("q", index.keys()).tofile(index_file)
+        array("Q", index.values()).tofile(index_file)
+
+def commit_fingerprint_index(path):
+
+    # Promote the index of this run once its output file has been written
+    pending_path = f"{path}.pending"
+    if os.path.exists(pending_path):
+        os.replace(pending_path, path)
+
+class DeltaTracker:
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.previous = load_fingerprint_index(index_path)
+        self.current = {}
+        self.counts = {INSERT: 0, UPDATE: 0, DELETE: 0, "unchanged": 0}
+
+    def classify(self, employee_ids, fingerprints):
+        # Returns one change type per record, or None where it is identical to the last run
+        self.current.update(zip(employee_ids, fingerprints))
+        previous = self.previous.get
+        change_types = []
+        append = change_types.append
+        for employee_id, record_fingerprint in zip(employee_ids, fingerprints):
+            previous_fingerprint = previous(employee_id)
+            if previous_fingerprint is None:
+                append(INSERT)
+            elif previous_fingerprint != record_fingerprint:
+                append(UPDATE)
+            else:
+                append(None)
+        inserted = change_types.count(INSERT)
+        updated = change_types.count(UPDATE)
+        self.counts[INSERT] += inserted
+        self.counts[UPDATE] += updated
+        self.counts["unchanged"] += len(change_types) - inserted - updated
+        return change_types
+
+    def deleted_ids(self):
+        # Ids present in the previous run but not seen in this one; call after all records
+        deleted = [employee_id for employee_id in self.previous if employee_id not in self.current]
+        self.counts[DELETE] = len(deleted)
+        return deleted
+
+    def summary(self):
+        return dict(self.counts, index_path=self.index_path, previous_ids=len(self.previous),
+                    current_ids=len(self.current))
+
+    def save_pending(self):
+        write_fingerprint_index(f"{self.index_path}.pending", self.current)
+
+def delta_records(records, tracker):
+
+    # Keep only inserted and updated records, then append one row per deleted id
+    columns = list(records[0].keys()) if records else ["employee_id"]
+    return changed_records(records, tracker) + deleted_records(tracker, columns)
+
+def changed_records(records, tracker):
+
+    # Inserted and updated records of one batch, tagged with their change type
+    change_types = tracker.classify([record["employee_id"] for record in records],
+                                    [fingerprint(record.values()) for record in records])
+    return [tag_change(record, change_type)
+            for record, change_type in zip(records, change_types) if change_type]
+
+def tag_change(record, change_type):
+
+    # Slotted employee records have a variant with a change_type field; dicts get an extra key
+    if isinstance(record, dict):
+        return dict(record, change_type=change_type)
+    return record.with_change_type(change_type)
+
+def deleted_records(tracker, columns):
+
+    # Deleted employees carry only their id and change type; call after every batch is classified
+    deleted = []
+    for employee_id in tracker.deleted_ids():
+        record = dict.fromkeys(columns)
+        record["employee_id"] = employee_id
+        record["change_type"] = DELETE
+        deleted.append(record)
+    return deleted
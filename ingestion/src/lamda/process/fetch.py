@@ -0,0 +1,118 @@
+import requests
+from urllib3.response import HTTPResponse
+from urllib3.util import make_headers
+from .http_session import DEFAULT_POOL_SIZE, get_session
+
+# HTTP/2 goes through httpx, which is optional; the "http2" config key requires it
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Content encodings asked for by default, most compact first
+DEFAULT_ENCODINGS = ["zstd", "br", "gzip", "deflate"]
+
+# Encodings urllib3 can decode here: gzip and deflate always, br and zstd only when the
+# brotli and zstd packages are installed. Nothing else is ever offered to the server.
+SUPPORTED_ENCODINGS = make_headers(accept_encoding=True)["accept-encoding"].split(",")
+
+# One HTTP/2 client per process; concurrent requests to a host share one connection
+_http2_client = None
+
+def accept_encoding(scraper_config):
+
+    # Accept-Encoding value for the configured preference, e.g. "gzip, deflate"
+    # httpx decodes zstd with a different package than urllib3, so HTTP/2 leaves it out
+    encodings = scraper_config.get("accept_encoding", DEFAULT_ENCODINGS)
+    http2 = scraper_config.get("http2", False)
+    negotiated = [encoding for encoding in encodings
+                  if encoding in SUPPORTED_ENCODINGS and not (http2 and encoding == "zstd")]
+    return ", ".join(negotiated) or "identity"
+
+def get_http2_client():
+
+    global _http2_client
+    if _http2_client is None:
+        if httpx is None:
+            raise ValueError("http2 requires the httpx package with HTTP/2 support (httpx[http2])")
+        try:
+            _http2_client = httpx.Client(http2=True, limits=httpx.Limits(max_keepalive_connections=DEFAULT_POOL_SIZE))
+        except ImportError:
+            raise ValueError("http2 requires the httpx package with HTTP/2 support (httpx[http2])") from None
+    return _http2_client
+
+def fetch(api_url, scraper_config, timeout, stream=False, headers=None):
+
+    # GET api_url with compression negotiated and the body decoded as it is read. Connections
+    # come from the shared pool; with "http2" set they are HTTP/2 and multiplexed.
+    headers = dict(headers or {}, **{"Accept-Encoding": accept_encoding(scraper_config)})
+    if not scraper_config.get("http2", False):
+        return get_session().get(api_url, timeout=timeout, stream=stream, headers=headers)
+
+    client = get_http2_client()
+    try:
+        response = client.send(client.build_request("GET", api_url, headers=headers, timeout=timeout), stream=True)
+    except httpx.TransportError as e:
+        raise requests.exceptions.ConnectionError(str(e)) from e
+    return Http2Response(response, stream)
+
+def transfer_metadata(response, scraper_config, decoded_bytes):
+
+    # Bytes on the wire against bytes after decoding, for a response whose body has been read
+    http_version = "HTTP/1.1"
+    wire_bytes = None
+    if isinstance(response, Http2Response):
+        http_version = response.http_version
+        wire_bytes = response.wire_bytes
+    elif isinstance(getattr(response, "raw", None), HTTPResponse):
+        http_version = response.raw.version_string
+        wire_bytes = response.raw.tell()
+    transfer = {
+        "http_version": http_version,
+        "accept_encoding": accept_encoding(scraper_config),
+        "content_encoding": response.headers.get("Content-Encoding", "identity"),
+        "wire_bytes": wire_bytes,
+        "decoded_bytes": decoded_bytes
+    }
+    if wire_bytes:
+        transfer["compression_ratio"] = round(decoded_bytes / wire_bytes, 2)
+    return transfer
+
+
+class Http2Response:
+
+    # The parts of the requests.Response interface the processors use, over an httpx response.
+    # Transport errors are raised as requests exceptions so the retry loop handles them alike.
+    def __init__(self, response, stream):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+        if not stream:
+            self._read(response.read)
+
+    def _read(self, read):
+        try:
+            return read()
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    @property
+    def content(self):
+        return self._read(self._response.read)
+
+    @property
+    def wire_bytes(self):
+        return self._response.num_bytes_downloaded
+
+    def json(self):
+        return self._read(self._response.json)
+
+    def iter_content(self, chunk_size=1):
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ChunkedEncodingError(str(e)) from e
+
+    def close(self):
+        self._response.close()
@@ -0,0 +1,145 @@
+from operator import itemgetter
+from .json_stream import RECORD_KEYS
+
+def to_int_via_float(value):
+    return int(float(value))
+
+# Converters a field mapping may name in its "type"
+CONVERTERS = {
+    "int": int,
+    "str": str,
+    "float_int": to_int_via_float
+}
+
+# Source keys probed for each canonical field, in priority order. A scraper can override any
+# entry through "field_mapping" in run_scraper.json.
+DEFAULT_FIELD_MAPPING = {
+    "employee_id": {"source": ["id"], "type": "int", "default": 0},
+    "first_name": {"source": ["first_name", "firstName"], "type": "str", "default": ""},
+    "last_name": {"source": ["last_name", "lastName"], "type": "str", "default": ""},
+    "email": {"source": ["email"], "type": "str", "default": ""},
+    "phone": {"source": ["phone", "phoneNumber"], "type": "str", "default": ""},
+    "gender": {"source": ["gender"], "type": "str", "default": ""},
+    "age": {"source": ["age"], "type": "int", "default": 0},
+    "job_title": {"source": ["job_title", "jobTitle"], "type": "str", "default": ""},
+    "years_of_experience": {"source": ["years_of_experience", "experience"], "type": "int", "default": 0},
+    "salary": {"source": ["salary"], "type": "float_int", "default": 0},
+    "department": {"source": ["department"], "type": "str", "default": ""}
+}
+
+
+class FieldPlan:
+
+    # Field mapping resolved against one sample record: every field gets a fixed source key,
+    # and all of them are fetched with a single itemgetter call per record
+    def __init__(self, mapping, sample_record):
+        self.fields = list(mapping)
+        self.types = [mapping[field]["type"] for field in self.fields]
+        self.converters = [CONVERTERS[field_type] for field_type in self.types]
+        self.aliases = [list(mapping[field]["source"]) for field in self.fields]
+        self.defaults = [mapping[field].get("default") for field in self.fields]
+        self.keys = [
+            next((alias for alias in aliases if alias in sample_record), aliases[0])
+            for aliases in self.aliases
+        ]
+        getter = itemgetter(*self.keys)
+        self.getter = getter if len(self.keys) > 1 else (lambda record: (getter(record),))
+
+    def probe(self, record):
+        # Slow path for records that lack one of the resolved keys: full alias fallback
+        values = []
+        for aliases, default in zip(self.aliases, self.defaults):
+            value = default
+            for alias in aliases:
+                if alias in record:
+                    value = record[alias]
+                    break
+            values.append(value)
+        return tuple(values)
+
+    def extract(self, record):
+        try:
+            return self.getter(record)
+        except KeyError:
+            return self.probe(record)
+
+    def skip_reason(self, values):
+        # Names the first field whose converter rejects its value; only called for bad records
+        for field, convert, value in zip(self.fields, self.converters, values):
+            try:
+                convert(value)
+            except (ValueError, TypeError):
+                return f"invalid_{field}"
+        return "invalid_record"
+
+    def extract_rows(self, records):
+        # Raw source values of every record as tuples in plan field order
+        getter = self.getter
+        probe = self.probe
+        rows = []
+        append = rows.append
+        for record in records:
+            try:
+                append(getter(record))
+            except KeyError:
+                append(probe(record))
+        return rows
+
+
+def resolve_field_mapping(field_mapping=None):
+
+    # Merge per-field overrides from the scraper config over the defaults
+    mapping = {field: dict(spec) for field, spec in DEFAULT_FIELD_MAPPING.items()}
+    for field, spec in (field_mapping or {}).items():
+        if field not in mapping:
+            raise ValueError(f"Unknown field in field_mapping: {field}")
+        if isinstance(spec, (list, str)):
+            spec = {"source": [spec] if isinstance(spec, str) else spec}
+        mapping[field].update(spec)
+        if mapping[field]["type"] not in CONVERTERS:
+            raise ValueError(f"Unknown type for field {field}: {mapping[field]['type']}")
+    return mapping
+
+def compile_field_plan(field_mapping, sample_record):
+
+    return FieldPlan(resolve_field_mapping(field_mapping), sample_record)
+
+def find_employee_records(raw_data, record_keys=RECORD_KEYS):
+
+    # Extract employees data - handle different possible structures
+    employees = []
+
+    if isinstance(raw_data, dict):
+        # Try the known keys where employee data might be, in priority order
+        for key in record_keys:
+            if key in raw_data:
+                employees = raw_data[key]
+                break
+    elif isinstance(raw_data, list):
+        # The API might return a direct list of employees
+        employees = raw_data
+
+    # If we still don't have employee data, try to infer from the structure
+    if not employees and isinstance(raw_data, dict):
+        # Look for any key that contains a list which might be employee data
+        for key, value in raw_data.items():
+            if isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
+                print(f"Found potential employee data in key: {key}")
+                employees = value
+                break
+
+    # If we still have no employees data, raise an error with more information
+    if not employees:
+        error_msg = "Could not find employee data in the API response. "
+        if isinstance(raw_data, dict):
+            error_msg += f"Available keys: {list(raw_data.keys())}"
+        else:
+            error_msg += f"Response is not a dictionary but a {type(raw_data)}"
+        raise ValueError(error_msg)
+
+    print(f"Found {len(employees)} employee records to process")
+
+    # Print the first employee record for debugging
+    print(f"Sample employee record keys: {list(employees[0].keys()) if isinstance(employees[0], dict) else 'Not a dictionary'}")
+
+    return employees
@@ -0,0 +1,138 @@
+import bz2
+import glob
+import gzip
+import io
+import json
+import lzma
+import mmap
+import os
+from contextlib import contextmanager
+from functools import partial
+from .field_mapping import find_employee_records
+from .instrumentation import RunStats
+from .json_stream import DEFAULT_CHUNK_SIZE, iter_employee_records
+
+# orjson parses straight from the memory map without copying it into a bytes object first
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Values of the "source" config key
+HTTP_SOURCE = "http"
+FILE_SOURCE = "file"
+
+# Compression is detected from the file suffix
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+
+# Files holding one JSON record per line; anything else is parsed as a JSON document
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+JSON_SUFFIXES = (".json",) + NDJSON_SUFFIXES
+
+def source_type(scraper_config):
+
+    return scraper_config.get("source", HTTP_SOURCE)
+
+def source_path(scraper_config):
+
+    # json_file_path is accepted as well, as used by the test fixtures
+    path = scraper_config.get("source_path") or scraper_config.get("json_file_path")
+    if not path:
+        raise ValueError("A file source needs source_path in the scraper configuration")
+    return path
+
+def loads(data):
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))
+
+def split_suffixes(path):
+
+    # json_100.ndjson.gz -> (".ndjson", "gzip")
+    base, suffix = os.path.splitext(path)
+    compression = COMPRESSION_SUFFIXES.get(suffix.lower())
+    if compression:
+        suffix = os.path.splitext(base)[1]
+    return suffix.lower(), compression or "none"
+
+def source_files(path, pattern=None):
+
+    # A single file, or every JSON/NDJSON dump in a directory in name order, so replays are repeatable
+    if not os.path.isdir(path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Source file not found: {path}")
+        return [path]
+    candidates = sorted(glob.glob(os.path.join(path, pattern or "*")))
+    return [candidate for candidate in candidates
+            if os.path.isfile(candidate) and split_suffixes(candidate)[0] in JSON_SUFFIXES]
+
+@contextmanager
+def open_source(path, compression):
+
+    # Plain files are memory-mapped: the kernel pages them in as the parser advances and no
+    # copy of the file is made on the Python heap. Compressed files are decompressed as a stream.
+    if compression == "none":
+        with open(path, 'rb') as source_file, \
+                mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            yield mapped
+    elif compression == "gzip":
+        with gzip.open(path, 'rb') as source_file:
+            yield source_file
+    elif compression == "bz2":
+        with bz2.open(path, 'rb') as source_file:
+            yield source_file
+    elif compression == "xz":
+        with lzma.open(path, 'rb') as source_file:
+            yield source_file
+    elif zstandard is None:
+        raise ValueError(f"Reading {path} requires the zstandard package")
+    else:
+        with open(path, 'rb') as raw_file, \
+                io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw_file)) as source_file:
+            yield source_file
+
+def iter_file_records(path, stream=False, chunk_size=DEFAULT_CHUNK_SIZE):
+
+    suffix, compression = split_suffixes(path)
+    if compression == "none" and os.path.getsize(path) == 0:
+        print(f"Skipping empty source file: {path}")
+        return
+    with open_source(path, compression) as source:
+        if suffix in NDJSON_SUFFIXES:
+            # One record per line; blank lines are ignored
+            for line in iter(source.readline, b""):
+                if line.strip():
+                    yield loads(line)
+        elif stream:
+            # Parse the employee array record by record, as for a streamed HTTP body
+            yield from iter_employee_records(iter(partial(source.read, chunk_size), b""))
+        else:
+            if compression == "none":
+                with memoryview(source) as view:
+                    raw_data = loads(view)
+            else:
+                raw_data = loads(source.read())
+            yield from find_employee_records(raw_data)
+
+def iter_source_records(scraper_config, stats=None):
+
+    # Raw employee records of every source file in turn, read lazily
+    stats = stats or RunStats()
+    path = source_path(scraper_config)
+    stream = scraper_config.get("stream", False)
+    chunk_size = scraper_config.get("chunk_size", DEFAULT_CHUNK_SIZE)
+    files = source_files(path, scraper_config.get("source_pattern"))
+    if not files:
+        raise ValueError(f"No JSON or NDJSON files found in {path}")
+    for file_path in files:
+        print(f"Reading employee data from: {file_path}")
+        stats.add_bytes("fetch", os.path.getsize(file_path))
+        yield from iter_file_records(file_path, stream, chunk_size)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+# Validator cache file used when a scraper enables conditional_fetch without a path
+DEFAULT_VALIDATOR_CACHE = "validator_cache.json"
+
+# Scrapers of a batch run share the cache file; updates are read-modify-write, so they are serialised
+_cache_lock = threading.Lock()
+
+def validator_cache_path(scraper_config):
+
+    # None means conditional fetching is disabled for this scraper. A delta run over unchanged
+    # data has to produce an empty delta, not the previous run's changes, so delta mode always
+    # fetches and transforms.
+    if not scraper_config.get("conditional_fetch", False) or scraper_config.get("delta", False):
+        return None
+    return scraper_config.get("validator_cache_path", DEFAULT_VALIDATOR_CACHE)
+
+def cache_key(scraper_config, api_url):
+
+    # Scrapers sharing an API write different outputs, so each has its own entry
+    return f"{scraper_config.get('scraper_name', '')} {api_url}"
+
+def config_hash(scraper_config):
+
+    # Output format, compression, field mapping and the like decide what the cached output holds
+    return content_hash(json.dumps(scraper_config, sort_keys=True, default=str).encode("utf-8"))
+
+def load_validators(cache_path, scraper_config, api_url):
+
+    # Return the scraper's cached validators for api_url, but only while the output they point to
+    # still exists and was written with the same scraper settings
+    if not cache_path or not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'r') as cache_file:
+            entry = json.load(cache_file).get(cache_key(scraper_config, api_url))
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable validator cache {cache_path}: {str(e)}")
+        return None
+
+    if not entry or not entry.get("output_file") or not os.path.exists(entry["output_file"]):
+        return None
+    if entry.get("config_hash") != config_hash(scraper_config):
+        return None
+    return entry
+
+def conditional_headers(entry):
+
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def response_validators(response, body_hash):
+
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "content_hash": body_hash
+    }
+
+def content_hash(body):
+
+    return hashlib.sha256(body).hexdigest()
+
+def hashing_chunks(chunks, hasher):
+
+    # Pass stream chunks through unchanged while feeding them to hasher
+    for chunk in chunks:
+        hasher.update(chunk)
+        yield chunk
+
+def save_validators(cache_path, scraper_config, api_url, validators, output_file, record_count):
+
+    if not cache_path or not validators:
+        return
+    with _cache_lock:
+        cache = {}
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as cache_file:
+                    cache = json.load(cache_file)
+            except (OSError, ValueError):
+                cache = {}
+
+        cache[cache_key(scraper_config, api_url)] = dict(
+            validators, output_file=output_file, record_count=record_count,
+            config_hash=config_hash(scraper_config), updated_at=datetime.now().isoformat())
+
+        # Write to a temporary file first so an interrupted run never leaves a corrupt cache
+        temp_path = f"{cache_path}.tmp"
+        with open(temp_path, 'w') as cache_file:
+            json.dump(cache, cache_file, indent=2)
+        os.replace(temp_path, cache_path)
+
+def cache_hit_metadata(entry, api_url, reason):
+
+    return {
+        "processed_at": datetime.now().isoformat(),
+        "record_count": entry.get("record_count"),
+        "source": api_url,
+        "cache_hit": True,
+        "cache_reason": reason,
+        "output_file": entry["output_file"]
+    }
@@ -0,0 +1,60 @@
+import requests
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+
+# Connections kept open per host
+DEFAULT_POOL_SIZE = 10
+
+# One session per process. Warm Lambda invocations reuse it, so the TCP and TLS connections
+# to the API outlive a single call.
+_session = None
+_pool_settings = None
+
+def _mount(session, pool_connections, pool_maxsize, pool_block):
+
+    global _pool_settings
+    replaced = {session.adapters.get("http://"), session.adapters.get("https://")}
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    _pool_settings = (pool_connections, pool_maxsize, pool_block)
+
+    # Idle connections of the replaced pools would otherwise stay open until garbage collection;
+    # connections still in use are closed when they are released
+    for old_adapter in replaced:
+        if old_adapter is not None:
+            old_adapter.close()
+
+def get_session():
+
+    global _session
+    if _session is None:
+        session = requests.Session()
+        _mount(session, DEFAULT_POOL_SIZE, DEFAULT_POOL_SIZE, False)
+        _session = session
+    return _session
+
+def configure_session(max_per_host=None, hosts=DEFAULT_POOL_SIZE):
+
+    # urllib3 keeps one connection pool per host. With max_per_host set the pools block, so at
+    # most that many requests (or open streamed responses) hit one host at a time and the
+    # rest wait for a free connection. hosts is the number of per-host pools kept alive.
+    session = get_session()
+    settings = (max(hosts, DEFAULT_POOL_SIZE), max_per_host or DEFAULT_POOL_SIZE, max_per_host is not None)
+    if settings != _pool_settings:
+        _mount(session, *settings)
+    return session
+
+@contextmanager
+def session_limits(max_per_host=None, hosts=DEFAULT_POOL_SIZE):
+
+    # configure_session for one block, e.g. a batch run. The previous pools are mounted again
+    # afterwards, so later calls in a warm process do not inherit the batch's per-host cap.
+    get_session()
+    previous = _pool_settings
+    session = configure_session(max_per_host, hosts)
+    try:
+        yield session
+    finally:
+        if _pool_settings != previous:
+            _mount(session, *previous)
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Counters reported for every run, even when they stay at zero
+COUNTERS = ("records_in", "records_written", "records_skipped", "retries")
+
+_END = object()
+
+
+class RunStats:
+
+    # Wall time and bytes per stage (fetch, parse, transform, write) plus record counters for
+    # one handler invocation. Stages run on overlapping threads in pipeline mode, so their
+    # times can add up to more than total_seconds. Stages named with a leading underscore are
+    # bookkeeping only and are left out of the report.
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.skip_reasons = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage, seconds, byte_count=0):
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"seconds": 0.0, "bytes": 0})
+            entry["seconds"] += seconds
+            entry["bytes"] += byte_count
+
+    def add_bytes(self, stage, byte_count):
+        self.add_time(stage, 0.0, byte_count)
+
+    def seconds(self, stage):
+        entry = self.stages.get(stage)
+        return entry["seconds"] if entry else 0.0
+
+    def byte_count(self, stage):
+        entry = self.stages.get(stage)
+        return entry["bytes"] if entry else 0
+
+    def count(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def skip(self, reason, amount=1):
+        with self._lock:
+            self.counters["records_skipped"] += amount
+            self.skip_reasons[reason] = self.skip_reasons.get(reason, 0) + amount
+
+    @contextmanager
+    def stage(self, name, exclude=()):
+        # Time the block, minus whatever the excluded stages accrued inside it. Only exclude
+        # stages that are measured on the same thread, e.g. fetch time inside a parse step.
+        excluded = sum(map(self.seconds, exclude))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            nested = sum(map(self.seconds, exclude)) - excluded
+            self.add_time(name, time.perf_counter() - start - nested)
+
+    def timed_iter(self, iterable, stage, exclude=(), measure_bytes=False):
+        # Charge the time spent producing each item to stage; meant for chunks and batches,
+        # not single records, to keep the overhead negligible
+        iterator = iter(iterable)
+        while True:
+            with self.stage(stage, exclude):
+                item = next(iterator, _END)
+            if item is _END:
+                return
+            if measure_bytes:
+                self.add_bytes(stage, len(item))
+            yield item
+
+    def merge(self, other):
+        # Fold in the as_dict() report of a worker process
+        for stage, entry in other["stages"].items():
+            self.add_time(stage, entry["seconds"], entry["bytes"])
+        for counter in COUNTERS:
+            if counter != "records_skipped":
+                self.count(counter, other.get(counter, 0))
+        for reason, amount in other["skip_reasons"].items():
+            self.skip(reason, amount)
+
+    def as_dict(self):
+        with self._lock:
+            return dict(
+                total_seconds=round(time.perf_counter() - self.started, 4),
+                stages={
+                    stage: {"seconds": round(entry["seconds"], 4), "bytes": entry["bytes"]}
+                    for stage, entry in self.stages.items() if not stage.startswith("_")
+                },
+                skip_reasons=dict(self.skip_reasons),
+                **self.counters
+            )
+
+
+def log_stats(scraper_config, stats, **fields):
+
+    # With log_stats enabled, emit the stats as one structured JSON log line per invocation
+    if scraper_config.get("log_stats", False):
+        print(json.dumps(dict(event="scraper_stats", scraper_name=scraper_config.get("scraper_name"),
+                              **fields, **stats)))
@@ -1,50 +1,137 @@
-import json
+import hashlib
+import os
 import requests
-import time
 from datetime import datetime
+from itertools import chain
+from .dedup import dedup_records, open_dedup_index
+from .delta import DeltaTracker, changed_records, delta_records, deleted_records, fingerprint_index_path
+from .fetch import fetch, transfer_metadata
+from .field_mapping import compile_field_plan, find_employee_records
+from .file_source import FILE_SOURCE, iter_source_records, source_path, source_type
+from .http_cache import (cache_hit_metadata, conditional_headers, hashing_chunks, load_validators,
+                         response_validators, validator_cache_path)
+from .instrumentation import RunStats
+from .json_stream import DEFAULT_CHUNK_SIZE, iter_employee_records
+from .json_writer import open_record_writer
+from .pipeline import DEFAULT_BATCH_SIZE, DEFAULT_QUEUE_SIZE, iter_batches, iter_pipelined
+from .records import OUTPUT_FIELDS, EmployeeRecord, as_dicts
+from .retry import RetryPolicy
 
-def process_employee_data(scraper_config):
+def process_employee_data(scraper_config, output_file=None, stats=None, deadline=None):
     # Get the API URL from the scraper config or use the default
     api_url = scraper_config.get("api_url", "https://api.slingacademy.com/v1/sample-data/files/employees.json")
     
-    # Maximum number of retry attempts
-    max_retries = 3
+    # Backoff, retryable statuses and the maximum number of attempts come from the scraper config;
+    # deadline is the monotonic time by which the invocation has to finish
+    retry_policy = RetryPolicy.from_config(scraper_config, deadline)
+    max_retries = retry_policy.attempts
     retry_count = 0
     
+    # Stage timings and record counters; the handler reports them in the response metadata
+    stats = stats or RunStats()
+    
+    # A file source replays local dumps through the same transform path, without any HTTP
+    if source_type(scraper_config) == FILE_SOURCE:
+        return process_file_source(scraper_config, output_file, stats)
+    
+    # With conditional_fetch enabled, send the validators of the last successful run
+    cache_path = validator_cache_path(scraper_config)
+    cached = load_validators(cache_path, scraper_config, api_url)
+    headers = conditional_headers(cached)
+    
+    # Pipeline and stream modes write batches to output_file while later ones are still being
+    # fetched, so the returned "data" is None and the caller must not write the file again
+    stream = scraper_config.get("stream", False)
+    
     while retry_count < max_retries:
         try:
             # Make the HTTP request to the API
             print(f"Attempting to fetch data from: {api_url}")
-            response = requests.get(api_url, timeout=30)
+            fetched_bytes = stats.byte_count("fetch")
+            with stats.stage("fetch"):
+                response = fetch(api_url, scraper_config, retry_policy.request_timeout(scraper_config.get("timeout", 30)),
+                                 stream, headers)
+            
+            # Upstream has not changed since the cached run; reuse its output
+            if response.status_code == 304 and cached:
+                print("API data not modified since last run, reusing previous output")
+                return {
+                    "metadata": cache_hit_metadata(cached, api_url, "not_modified"),
+                    "data": None
+                }
             
             # Check if the request was successful
             if response.status_code == 200:
-                # Parse the JSON response
-                raw_data = response.json()
+                hasher = hashlib.sha256()
+                if stream:
+                    # Parse the employee array item by item instead of loading the whole body
+                    chunk_size = scraper_config.get("chunk_size", DEFAULT_CHUNK_SIZE)
+                    chunks = stats.timed_iter(response.iter_content(chunk_size=chunk_size), "fetch",
+                                              measure_bytes=True)
+                    if cache_path:
+                        chunks = hashing_chunks(chunks, hasher)
+                    records = iter_employee_records(chunks)
+                else:
+                    stats.add_bytes("fetch", len(response.content))
+                    
+                    # Identical content to the cached run means the previous output is still valid
+                    if cache_path:
+                        hasher.update(response.content)
+                        if cached and cached.get("content_hash") == hasher.hexdigest():
+                            print("API data unchanged since last run, reusing previous output")
+                            return {
+                                "metadata": cache_hit_metadata(cached, api_url, "content_unchanged"),
+                                "data": None
+                            }
+                    
+                    # Parse the JSON response
+                    with stats.stage("parse"):
+                        raw_data = response.json()
+                        
+                        # Print the structure of the response for debugging
+                        print(f"API Response structure: {list(raw_data.keys()) if isinstance(raw_data, dict) else 'Not a dictionary'}")
+                        records = find_employee_records(raw_data)
                 
-                # Print the structure of the response for debugging
-                print(f"API Response structure: {list(raw_data.keys()) if isinstance(raw_data, dict) else 'Not a dictionary'}")
+                metadata = {
+                    "processed_at": datetime.now().isoformat(),
+                    "source": api_url
+                }
+                try:
+                    processed_data = process_records(records, scraper_config, output_file, metadata, stats)
+                    
+                    # The parser stops at the end of the record array; read the rest of the body so
+                    # that the content hash and the transferred byte count cover all of it
+                    if stream:
+                        for _ in chunks:
+                            pass
+                finally:
+                    response.close()
+                metadata["transfer"] = transfer_metadata(response, scraper_config,
+                                                         stats.byte_count("fetch") - fetched_bytes)
                 
-                # Transform the data according to requirements
-                processed_data = transform_employee_data(raw_data)
+                # The handler stores the validators once the output file exists
+                if cache_path:
+                    metadata["cache_hit"] = False
+                    metadata["validators"] = response_validators(response, hasher.hexdigest())
                 
                 # Return the processed data
                 return {
-                    "metadata": {
-                        "processed_at": datetime.now().isoformat(),
-                        "record_count": len(processed_data),
-                        "source": api_url
-                    },
+                    "metadata": metadata,
                     "data": processed_data
                 }
             else:
                 print(f"Error: API returned status code {response.status_code}")
+                
+                # Client errors other than 408/425/429 will not succeed on a retry
+                if not retry_policy.is_retryable(response.status_code):
+                    raise Exception(f"API returned non-retryable status code {response.status_code}")
                 retry_count += 1
                 if retry_count >= max_retries:
                     raise Exception(f"Failed to retrieve data after {max_retries} attempts. Last status code: {response.status_code}")
                 
-                # Wait before retrying
-                time.sleep(2)
+                # Back off before retrying, honouring Retry-After on 429/503
+                retry_policy.wait(retry_count, response)
+                stats.count("retries")
                 
         except requests.exceptions.RequestException as e:
             print(f"Request error: {str(e)}")
@@ -52,75 +139,163 @@ def process_employee_data(scraper_config):
             if retry_count >= max_retries:
                 raise Exception(f"Failed to connect to API after {max_retries} attempts. Error: {str(e)}")
             
-            # Wait before retrying
-            time.sleep(2)
+            # Back off before retrying
+            retry_policy.wait(retry_count)
+            stats.count("retries")
     
     raise Exception("Failed to process employee data")
 
-def transform_employee_data(raw_data):
-  list: Transformed employee data
+def process_file_source(scraper_config, output_file=None, stats=None):
     
-    transformed_data = []
+    stats = stats or RunStats()
+    path = source_path(scraper_config)
+    metadata = {
+        "processed_at": datetime.now().isoformat(),
+        "source": path,
+        "source_type": FILE_SOURCE
+    }
+    processed_data = process_records(iter_source_records(scraper_config, stats), scraper_config, output_file,
+                                     metadata, stats)
+    return {
+        "metadata": metadata,
+        "data": processed_data
+    }
+
+def process_records(records, scraper_config, output_file, metadata, stats=None):
+    
+    # Shared by every source: transform raw records and complete metadata in place. In pipeline
+    # and stream modes the records are written to output_file as they go and None is returned,
+    # so a streamed body is never collected into a list.
+    stats = stats or RunStats()
+    pipeline = (scraper_config.get("pipeline", False) or scraper_config.get("stream", False)) and output_file is not None
+    
+    # Delta mode keeps only rows that changed since the last run, keyed by employee_id
+    index_path = fingerprint_index_path(scraper_config)
+    tracker = DeltaTracker(index_path) if index_path else None
     
-    # Extract employees data - handle different possible structures
-    employees = []
-    
-    # Debug the structure of raw_data
-    print(f"Raw data type: {type(raw_data)}")
-    
-    if isinstance(raw_data, dict):
-        # Try different possible keys where employee data might be
-        if "employees" in raw_data:
-            employees = raw_data["employees"]
-        elif "users" in raw_data:
-            employees = raw_data["users"]
-        elif "data" in raw_data:
-            employees = raw_data["data"]
-        elif "success" in raw_data and "data" in raw_data:
-            employees = raw_data["data"]
-    elif isinstance(raw_data, list):
-        # The API might return a direct list of employees
-        employees = raw_data
-    
-    # If we still don't have employee data, try to infer from the structure
-    if not employees and isinstance(raw_data, dict):
-        # Look for any key that contains a list which might be employee data
-        for key, value in raw_data.items():
-            if isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
-                print(f"Found potential employee data in key: {key}")
-                employees = value
-                break
-    
-    # If we still have no employees data, raise an error with more information
-    if not employees:
-        error_msg = "Could not find employee data in the API response. "
-        if isinstance(raw_data, dict):
-            error_msg += f"Available keys: {list(raw_data.keys())}"
+    # Dedup mode drops (or flags) records whose employee_id or email an earlier batch or run wrote
+    dedup = open_dedup_index(scraper_config, output_file or scraper_config.get("scraper_name"))
+    
+    try:
+        if pipeline:
+            write_employee_records(records, output_file, metadata, tracker, scraper_config, stats, dedup)
+            processed_data = None
         else:
-            error_msg += f"Response is not a dictionary but a {type(raw_data)}"
-        raise ValueError(error_msg)
+            # Transform the data according to requirements, one batch at a time so that
+            # parsing a streamed body is timed separately from the transform
+            processed_data = []
+            batch_size = scraper_config.get("batch_size", DEFAULT_BATCH_SIZE)
+            for batch in stats.timed_iter(iter_batches(records, batch_size), "parse", exclude=("fetch",)):
+                with stats.stage("transform"):
+                    transformed = transform_employee_records(batch, scraper_config.get("field_mapping"), stats)
+                    processed_data.extend(dedup_records(transformed, dedup, stats) if dedup else transformed)
+            if tracker:
+                with stats.stage("transform"):
+                    processed_data = delta_records(processed_data, tracker)
+            metadata["record_count"] = len(processed_data)
+            if tracker:
+                metadata["output_mode"] = "delta"
+                metadata["delta"] = tracker.summary()
+    except BaseException:
+        if dedup:
+            dedup.abort()
+        raise
+    
+    # The handler commits the pending indexes once the output file exists
+    if tracker:
+        tracker.save_pending()
+    if dedup:
+        metadata["validation"] = dedup.summary(stats)
+        dedup.save_pending()
+    return processed_data
+
+def write_employee_records(records, output_file, metadata, tracker=None, scraper_config=None, stats=None,
+                           dedup=None):
+    
+    # Read, transform and write fixed-size batches on overlapping threads with bounded queues;
+    # metadata is completed in place and written as the last key of the file
+    scraper_config = scraper_config or {}
+    stats = stats or RunStats()
+    batch_size = scraper_config.get("batch_size", DEFAULT_BATCH_SIZE)
+    queue_size = scraper_config.get("queue_size", DEFAULT_QUEUE_SIZE)
+    batches = stats.timed_iter(iter_batches(records, batch_size), "parse", exclude=("fetch",))
+    
+    def transform(batch):
+        with stats.stage("transform"):
+            transformed = transform_employee_records(batch, scraper_config.get("field_mapping"), stats)
+            if dedup:
+                transformed = dedup_records(transformed, dedup, stats)
+            return changed_records(transformed, tracker) if tracker else transformed
+    
+    writer = open_record_writer(output_file, scraper_config)
+    try:
+        for chunk in iter_pipelined(batches, transform, queue_size):
+            with stats.stage("write"):
+                writer.write_records(chunk)
+        if tracker:
+            with stats.stage("write"):
+                writer.write_records(deleted_records(tracker, OUTPUT_FIELDS))
+    except BaseException:
+        writer.abort()
+        raise
     
-    print(f"Found {len(employees)} employee records to process")
+    metadata["record_count"] = writer.record_count
+    if tracker:
+        metadata["output_mode"] = "delta"
+        metadata["delta"] = tracker.summary()
+    with stats.stage("write"):
+        writer.close(metadata)
+    stats.add_bytes("write", os.path.getsize(output_file))
+    stats.count("records_written", writer.record_count)
+    return metadata
+
+def transform_employee_data(raw_data, field_mapping=None):
+    
+    # Public entry point, so the records are handed out as plain dicts
+    return as_dicts(transform_employee_records(find_employee_records(raw_data), field_mapping))
+
+def transform_employee_records(employees, field_mapping=None, stats=None):
     
-    # Print the first employee record for debugging
-    if employees and len(employees) > 0:
-        print(f"Sample employee record keys: {list(employees[0].keys()) if isinstance(employees[0], dict) else 'Not a dictionary'}")
+    # Works on any iterable of raw employee dicts, including the lazy stream parser, and returns
+    # slotted EmployeeRecords
+    transformed_data = []
+    stats = stats or RunStats()
+    skipped = 0
+    
+    # Resolve the field mapping against the first record once, instead of probing aliases per field
+    iterator = iter(employees)
+    first_employee = next(iterator, None)
+    if first_employee is None:
+        return transformed_data
+    plan = compile_field_plan(field_mapping, first_employee)
+    getter = plan.getter
+    probe = plan.probe
+    (to_employee_id, to_first_name, to_last_name, to_email, to_phone, to_gender, to_age, to_job_title,
+     to_years_of_experience, to_salary, to_department) = plan.converters
     
-    for employee in employees:
+    for employee in chain((first_employee,), iterator):
         try:
-            # Extract required fields with appropriate data type conversion
-            # Use get() with default values to handle missing fields
-            employee_id = int(employee.get("id", 0))
-            first_name = str(employee.get("first_name", employee.get("firstName", "")))
-            last_name = str(employee.get("last_name", employee.get("lastName", "")))
-            email = str(employee.get("email", ""))
-            phone = str(employee.get("phone", employee.get("phoneNumber", "")))
-            gender = str(employee.get("gender", ""))
-            age = int(employee.get("age", 0))
-            job_title = str(employee.get("job_title", employee.get("jobTitle", "")))
-            years_of_experience = int(employee.get("years_of_experience", employee.get("experience", 0)))
-            salary = int(float(employee.get("salary", 0)))
-            department = str(employee.get("department", ""))
+            # One itemgetter call fetches every field; records missing a resolved key
+            # fall back to probing the aliases and mapping defaults
+            try:
+                values = getter(employee)
+            except KeyError:
+                values = probe(employee)
+            (employee_id, first_name, last_name, email, phone, gender, age, job_title,
+             years_of_experience, salary, department) = values
+            
+            # Apply the converters declared in the field mapping
+            employee_id = to_employee_id(employee_id)
+            first_name = to_first_name(first_name)
+            last_name = to_last_name(last_name)
+            email = to_email(email)
+            phone = to_phone(phone)
+            gender = to_gender(gender)
+            age = to_age(age)
+            job_title = to_job_title(job_title)
+            years_of_experience = to_years_of_experience(years_of_experience)
+            salary = to_salary(salary)
+            department = to_department(department)
             
             # 1. Create designation based on years of experience
             if years_of_experience < 3:
@@ -140,25 +315,18 @@ def transform_employee_data(raw_data):
             phone_value = "Invalid Number" if phone and 'x' in phone else phone
             
             # Create the transformed employee record
-            transformed_employee = {
-                "employee_id": employee_id,
-                "full_name": full_name,
-                "email": email,
-                "phone": phone_value,
-                "gender": gender,
-                "age": age,
-                "job_title": job_title,
-                "years_of_experience": years_of_experience,
-                "salary": salary,
-                "department": department,
-                "designation": designation
-            }
+            transformed_employee = EmployeeRecord(employee_id, full_name, email, phone_value, gender, age, job_title,
+                                                  years_of_experience, salary, department, designation)
             
             transformed_data.append(transformed_employee)
             
-        except (ValueError, TypeError) as e:
-            print(f"Error processing employee record: {str(e)}")
-            # Skip invalid records
+        except (ValueError, TypeError):
+            # Skip invalid records; they are counted by reason instead of printed one by one
+            stats.skip(plan.skip_reason(values))
+            skipped += 1
             continue
     
+    stats.count("records_in", len(transformed_data) + skipped)
+    if skipped:
+        print(f"Skipped {skipped} invalid employee records")
     return transformed_data
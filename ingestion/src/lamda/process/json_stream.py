@@ -0,0 +1,150 @@
+import codecs
+import json
+
+# Keys that usually hold the employee array, in the order find_employee_records probes them.
+# A stream cannot look ahead, so iter_employee_records takes the first non-empty array in the
+# document that sits under one of these keys or whose first element is an object instead.
+# The two only differ when a document holds more than one candidate array.
+RECORD_KEYS = ("employees", "users", "data")
+
+# Default number of bytes requested from the response per read
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Drop already-consumed text from the buffer once it grows past this many characters
+_COMPACT_THRESHOLD = 256 * 1024
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+_MISSING = object()
+
+
+class _TextBuffer:
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        # Pull the next chunk from the source; returns False once the source is exhausted
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if isinstance(chunk, bytes):
+                chunk = self._decoder.decode(chunk)
+            if not chunk:
+                continue
+            if self.pos > _COMPACT_THRESHOLD:
+                self.text = self.text[self.pos:]
+                self.pos = 0
+            self.text += chunk
+            return True
+        self.text += self._decoder.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        # Return the next non-whitespace character without consuming it ("" at end of input)
+        while True:
+            text = self.text
+            pos = self.pos
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(text):
+                return text[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            found = self.text[self.pos:self.pos + 20] or "end of input"
+            raise ValueError(f"Malformed JSON stream: expected '{char}' but found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        # Decode one complete JSON value starting at the current position
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self.fill():
+                value, end = _decoder.raw_decode(self.text, self.pos)
+                self.pos = end
+                return value
+
+
+def _iter_array(buffer):
+    buffer.expect("[")
+    if buffer.peek() == "]":
+        buffer.pos += 1
+        return
+    while True:
+        yield buffer.value()
+        separator = buffer.peek()
+        buffer.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Malformed JSON stream: expected ',' or ']' but found {separator!r}")
+
+
+def iter_employee_records(chunks, record_keys=RECORD_KEYS):
+
+    # Parse an iterable of bytes/str chunks and yield the employee records one at a time.
+    # Only the record currently being decoded is held in memory, never the whole body.
+    buffer = _TextBuffer(chunks)
+    first = buffer.peek()
+
+    if first == "[":
+        # The API returned a direct list of employees
+        records = _iter_array(buffer)
+        first_record = next(records, _MISSING)
+        if first_record is _MISSING:
+            raise ValueError("Could not find employee data in the API response. Response is an empty list")
+        yield first_record
+        yield from records
+        return
+    if first != "{":
+        raise ValueError("Could not find employee data in the API response. Response is not a dictionary or a list")
+
+    buffer.pos += 1
+    seen_keys = []
+    while buffer.peek() != "}":
+        if seen_keys:
+            buffer.expect(",")
+        key = buffer.value()
+        buffer.expect(":")
+        seen_keys.append(key)
+
+        if buffer.peek() != "[":
+            # Any other value is small metadata
+            buffer.value()
+            continue
+
+        # Decide on the first element, then stream the rest of the array; later keys are never read
+        records = _iter_array(buffer)
+        first_record = next(records, _MISSING)
+        if first_record is not _MISSING and (key in record_keys or isinstance(first_record, dict)):
+            if key not in record_keys:
+                print(f"Found potential employee data in key: {key}")
+            yield first_record
+            yield from records
+            return
+
+        # Not the records (e.g. an empty array or a list of tags); read past it element by element
+        for _ in records:
+            pass
+
+    raise ValueError(f"Could not find employee data in the API response. Available keys: {seen_keys}")
@@ -0,0 +1,151 @@
+import gzip
+import json
+from .pipeline import DEFAULT_BATCH_SIZE, iter_batches
+from .sql_sink import SinkWriter, open_sink
+
+# orjson serialises records several times faster than the json module; use it when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Values of the "output_format" config key
+OUTPUT_FORMATS = ("json", "ndjson")
+
+# File extension appended for each value of the "compression" config key
+COMPRESSION_EXTENSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Default levels favour write speed over the last few percent of file size
+DEFAULT_COMPRESSION_LEVELS = {"gzip": 6, "zstd": 3}
+
+def dumps(value):
+
+    # Compact UTF-8 JSON as bytes. orjson rejects integers outside 64 bits (e.g. an id of 2**64),
+    # so those values go through the json module instead of failing the run.
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=as_dict).encode("utf-8")
+
+def as_dict(value):
+
+    # json has no dataclass support; orjson serialises employee records without this
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def output_settings(scraper_config):
+
+    scraper_config = scraper_config or {}
+    output_format = scraper_config.get("output_format", "json")
+    compression = scraper_config.get("compression") or "none"
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output_format: {output_format}")
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the zstandard package")
+    level = scraper_config.get("compression_level", DEFAULT_COMPRESSION_LEVELS.get(compression))
+    return output_format, compression, level
+
+def output_extension(scraper_config):
+
+    # e.g. ".json", ".ndjson.gz" or ".json.zst"
+    output_format, compression, _ = output_settings(scraper_config)
+    return f".{output_format}{COMPRESSION_EXTENSIONS[compression]}"
+
+def metadata_path(path):
+
+    # NDJSON output keeps its metadata next to it: json_100_1.ndjson.gz -> json_100_1.metadata.json
+    return f"{path.rsplit('.ndjson', 1)[0]}.metadata.json"
+
+def open_output(path, compression="none", level=None):
+
+    # Binary file object that compresses on the fly, so nothing is buffered beyond one chunk
+    if compression == "gzip":
+        return gzip.open(path, 'wb', compresslevel=DEFAULT_COMPRESSION_LEVELS["gzip"] if level is None else level)
+    if compression == "zstd":
+        compressor = zstandard.ZstdCompressor(level=DEFAULT_COMPRESSION_LEVELS["zstd"] if level is None else level)
+        return compressor.stream_writer(open(path, 'wb'))
+    return open(path, 'wb')
+
+
+class JsonArrayWriter:
+
+    # Writes {"data": [...], "metadata": {...}} chunk by chunk. The metadata goes last because
+    # the record count is only known once every chunk has been written.
+    def __init__(self, path, compression="none", level=None):
+        self.path = path
+        self.record_count = 0
+        self._file = open_output(path, compression, level)
+        self._file.write(b'{"data":[')
+
+    def write_records(self, records):
+        if not records:
+            return
+        body = b",\n".join(map(dumps, records))
+        self._file.write((b",\n" if self.record_count else b"\n") + body)
+        self.record_count += len(records)
+
+    def close(self, metadata):
+        self._file.write(b'\n],"metadata":' + dumps(metadata) + b'}\n')
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+
+
+class NdjsonWriter:
+
+    # One record per line. The metadata goes to a separate file so that every line of the
+    # output stays a record for line-oriented readers.
+    def __init__(self, path, compression="none", level=None):
+        self.path = path
+        self.record_count = 0
+        self._file = open_output(path, compression, level)
+
+    def write_records(self, records):
+        if not records:
+            return
+        self._file.write(b"\n".join(map(dumps, records)) + b"\n")
+        self.record_count += len(records)
+
+    def close(self, metadata):
+        self._file.close()
+        with open(metadata_path(self.path), 'wb') as metadata_file:
+            metadata_file.write(dumps(metadata))
+
+    def abort(self):
+        self._file.close()
+
+
+def open_record_writer(path, scraper_config=None):
+
+    output_format, compression, level = output_settings(scraper_config)
+    writer_class = NdjsonWriter if output_format == "ndjson" else JsonArrayWriter
+    writer = writer_class(path, compression, level)
+
+    # With a sink configured every chunk is also loaded into the database
+    sink = open_sink(scraper_config) if scraper_config else None
+    return SinkWriter(writer, sink) if sink else writer
+
+def write_json_output(path, records, metadata, scraper_config=None):
+
+    # Write an already transformed list in batches instead of serialising it in one piece
+    batch_size = (scraper_config or {}).get("batch_size", DEFAULT_BATCH_SIZE)
+    writer = open_record_writer(path, scraper_config)
+    try:
+        for batch in iter_batches(records, batch_size):
+            writer.write_records(batch)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close(metadata)
+    return writer.record_count
@@ -0,0 +1,18 @@
+import importlib
+
+
+class LazyModule:
+
+    # Stands in for a heavy module until one of its attributes is first used, so invocations
+    # that never reach the code needing it (bad input, unchanged upstream data) skip the import
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        value = getattr(self._module, attr)
+        # Cache the attribute so later lookups no longer go through __getattr__
+        setattr(self, attr, value)
+        return value
@@ -0,0 +1,111 @@
+import queue
+import threading
+from itertools import islice
+
+# Records per batch flowing through the pipeline
+DEFAULT_BATCH_SIZE = 10000
+
+# Batches buffered between two stages; memory is capped at roughly this many batches per queue
+DEFAULT_QUEUE_SIZE = 4
+
+# How often a blocked stage re-checks whether the pipeline has been stopped
+_POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class _StageError:
+
+    def __init__(self, error):
+        self.error = error
+
+
+def iter_batches(records, batch_size):
+
+    # Slice a list or iterator of raw records into lists of at most batch_size records
+    if isinstance(records, list):
+        for start in range(0, len(records), batch_size):
+            yield records[start:start + batch_size]
+        if not records:
+            yield []
+        return
+    iterator = iter(records)
+    batch = list(islice(iterator, batch_size))
+    yield batch
+    while len(batch) == batch_size:
+        batch = list(islice(iterator, batch_size))
+        if batch:
+            yield batch
+
+def iter_pipelined(batches, transform, queue_size=DEFAULT_QUEUE_SIZE):
+
+    # Pull batches on one thread (which drives the lazy fetch + parse), transform them on a
+    # second thread and yield the results in order to the caller, who writes them. While the
+    # writer handles batch N the transformer works on N+1 and the reader on N+2.
+    parsed = queue.Queue(maxsize=queue_size)
+    transformed = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(target, item):
+        # Block while the next stage is busy, but give up once the pipeline is stopping
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(source):
+        while not stop.is_set():
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return None
+
+    def read_stage():
+        try:
+            for batch in batches:
+                if not put(parsed, batch):
+                    return
+            put(parsed, _DONE)
+        except BaseException as e:
+            put(parsed, _StageError(e))
+
+    def transform_stage():
+        while True:
+            item = get(parsed)
+            if item is None:
+                return
+            if item is _DONE or isinstance(item, _StageError):
+                put(transformed, item)
+                return
+            try:
+                result = transform(item)
+            except BaseException as e:
+                put(transformed, _StageError(e))
+                return
+            if not put(transformed, result):
+                return
+
+    threads = [
+        threading.Thread(target=read_stage, name="pipeline-read", daemon=True),
+        threading.Thread(target=transform_stage, name="pipeline-transform", daemon=True)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = transformed.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        # Also reached when the writer fails or stops consuming early
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,164 @@
+import cProfile
+import io
+import pstats
+import threading
+import tracemalloc
+
+# Rows in the allocation report and in the profile's text summary
+DEFAULT_TOP_N = 25
+
+# Functions and allocation sites listed in the response metadata
+SUMMARY_ROWS = 5
+
+# How often the sampler checks traced memory, and how much it has to grow past the last
+# snapshot before another one is taken. Grouping a snapshot costs seconds per million live
+# blocks, so doubling keeps the total to about twice the cost of the largest one.
+SAMPLE_SECONDS = 0.05
+SNAPSHOT_GROWTH = 2
+MIN_SNAPSHOT_BYTES = 16 << 20
+
+# Allocations made by tracemalloc itself or by the import system are not part of the run
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>")
+
+def profile_paths(scraper_config, run_scraper_id):
+
+    # Written next to the output file, e.g. json_100_1.prof and json_100_1.allocations.txt
+    base = f"{scraper_config['scraper_name']}_{run_scraper_id}"
+    return f"{base}.prof", f"{base}.allocations.txt"
+
+
+class PeakSampler:
+
+    # tracemalloc only reports the peak size, not what was allocated at that moment. This
+    # thread polls the traced size and, whenever it has grown well past the last snapshot,
+    # keeps the top allocation sites of a fresh one, so the report shows the heap close to
+    # its peak. Only the top-N statistics are kept, and the peak is reset after each
+    # snapshot so the snapshot's own memory is not counted.
+    def __init__(self, top_n):
+        self.top_n = top_n
+        self.peak = 0
+        self.snapshot_size = 0
+        self.statistics = []
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(SAMPLE_SECONDS):
+            self.sample()
+
+    def sample(self, force=False):
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        if force or current >= max(MIN_SNAPSHOT_BYTES, self.snapshot_size * SNAPSHOT_GROWTH):
+            # Dropping ignored files after grouping is far cheaper than Snapshot.filter_traces
+            snapshot = tracemalloc.take_snapshot()
+            statistics = [statistic for statistic in snapshot.statistics("lineno")
+                          if statistic.traceback[0].filename not in _IGNORED_FILES]
+            self.statistics = statistics[:self.top_n]
+            self.snapshot_size = current
+            del snapshot
+            tracemalloc.reset_peak()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        # A run that never grew past the threshold still gets a report of what it holds
+        self.sample(force=not self.statistics)
+
+
+class RunProfiler:
+
+    # cProfile for the calling thread and every thread started during the run (the pipeline
+    # stages), plus tracemalloc for all of them. Stats of all threads are merged on stop.
+    def __init__(self, top_n=DEFAULT_TOP_N):
+        self.top_n = top_n
+        self.profilers = []
+        self.sampler = PeakSampler(top_n)
+        self.started_tracing = False
+
+    def _profile_thread(self, *_):
+        # Installed with threading.setprofile: runs once in each new thread, then hands
+        # that thread over to its own cProfile profiler
+        profiler = cProfile.Profile()
+        self.profilers.append(profiler)
+        profiler.enable()
+
+    def start(self):
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.sampler.start()
+        threading.setprofile(self._profile_thread)
+        self._profile_thread()
+
+    def stop(self):
+        self.profilers[0].disable()
+        threading.setprofile(None)
+        self.sampler.stop()
+        if self.started_tracing:
+            tracemalloc.stop()
+        stats = pstats.Stats(self.profilers[0])
+        for profiler in self.profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+    def write(self, stats, profile_file, allocations_file):
+        # Binary pstats dump (for pstats, snakeviz and the like) and a plain-text allocation report
+        stats.dump_stats(profile_file)
+        with open(allocations_file, 'w') as report:
+            report.write(f"Peak traced memory: {self.sampler.peak} bytes\n")
+            report.write(f"Top {len(self.sampler.statistics)} allocation sites in the snapshot taken at "
+                         f"{self.sampler.snapshot_size} bytes traced:\n")
+            for statistic in self.sampler.statistics:
+                report.write(f"{statistic}\n")
+            stats.stream = io.StringIO()
+            stats.sort_stats("tottime").print_stats(self.top_n)
+            report.write(f"\nHottest functions by own time:\n{stats.stream.getvalue()}")
+
+    def summary(self, stats, profile_file, allocations_file):
+        hottest = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:SUMMARY_ROWS]
+        return {
+            "profile_file": profile_file,
+            "allocations_file": allocations_file,
+            "profiled_threads": len(self.profilers),
+            "total_seconds": round(stats.total_tt, 4),
+            "hottest_functions": [
+                {
+                    "function": pstats.func_std_string(function),
+                    "calls": calls,
+                    "own_seconds": round(own_seconds, 4),
+                    "cumulative_seconds": round(cumulative_seconds, 4)
+                }
+                for function, (_, calls, own_seconds, cumulative_seconds, _) in hottest
+            ],
+            "peak_traced_bytes": self.sampler.peak,
+            "top_allocations": [
+                {
+                    "location": f"{statistic.traceback[0].filename}:{statistic.traceback[0].lineno}",
+                    "bytes": statistic.size,
+                    "blocks": statistic.count
+                }
+                for statistic in self.sampler.statistics[:SUMMARY_ROWS]
+            ]
+        }
+
+
+def run_profiled(run_scraper, scraper_config, run_scraper_id, context=None, top_n=DEFAULT_TOP_N):
+
+    # Run one scraper the way the handler would and add a "profile" summary to its metadata.
+    # The artifacts are written even when the run fails, since that is often when they matter.
+    profile_file, allocations_file = profile_paths(scraper_config, run_scraper_id)
+    profiler = RunProfiler(top_n)
+    profiler.start()
+    try:
+        result = run_scraper(scraper_config, run_scraper_id, context)
+    finally:
+        stats = profiler.stop()
+        profiler.write(stats, profile_file, allocations_file)
+        print(f"Profile written to {profile_file} and {allocations_file}")
+    result.setdefault("metadata", {})["profile"] = profiler.summary(stats, profile_file, allocations_file)
+    return result
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+
+# Keys of every transformed employee record, in output order
+OUTPUT_FIELDS = ["employee_id", "full_name", "email", "phone", "gender", "age", "job_title",
+                 "years_of_experience", "salary", "department", "designation"]
+
+
+@dataclass
+class EmployeeRecord:
+
+    # One transformed employee. Slots instead of a per-record dict take a quarter of the memory
+    # (about 130 bytes against 470 for eleven fields), which adds up when a whole run is held
+    # before writing. orjson serialises dataclasses natively, in field order, as JSON objects;
+    # read access by key is kept so code written against dicts keeps working.
+    __slots__ = tuple(OUTPUT_FIELDS)
+    employee_id: int
+    full_name: str
+    email: str
+    phone: str
+    gender: str
+    age: int
+    job_title: str
+    years_of_experience: int
+    salary: int
+    department: str
+    designation: str
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def keys(self):
+        return list(self.__dataclass_fields__)
+
+    def values(self):
+        return [getattr(self, field) for field in self.__dataclass_fields__]
+
+    def as_dict(self):
+        return dict(zip(self.__dataclass_fields__, self.values()))
+
+    def with_change_type(self, change_type):
+        return EmployeeChange(*self.values(), change_type)
+
+
+@dataclass
+class EmployeeChange(EmployeeRecord):
+
+    # A record of delta output, tagged insert or update
+    __slots__ = ("change_type",)
+    change_type: str
+
+
+def as_dicts(records):
+
+    # Plain dicts for callers outside the processors, e.g. the public transform API and tests
+    return [record.as_dict() if isinstance(record, EmployeeRecord) else record for record in records]
@@ -0,0 +1,108 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Retry defaults; each can be overridden per scraper in run_scraper.json
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 30.0
+
+# Status codes worth another attempt; any other non-200 status fails immediately
+DEFAULT_RETRY_STATUSES = [408, 425, 429, 500, 502, 503, 504]
+
+# Status codes whose Retry-After header is honoured
+RETRY_AFTER_STATUSES = (429, 503)
+
+# Seconds kept back from the Lambda deadline to write the output and return a response
+DEFAULT_DEADLINE_MARGIN = 5.0
+
+def invocation_deadline(context, scraper_config):
+
+    # Monotonic time by which the handler has to be done, or None outside Lambda
+    get_remaining = getattr(context, "get_remaining_time_in_millis", None)
+    if get_remaining is None:
+        return None
+    margin = scraper_config.get("deadline_margin", DEFAULT_DEADLINE_MARGIN)
+    return time.monotonic() + get_remaining() / 1000 - margin
+
+def retry_after_seconds(response):
+
+    # Retry-After is either a number of seconds or an HTTP date
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+
+    def __init__(self, attempts=DEFAULT_RETRY_ATTEMPTS, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_max=DEFAULT_BACKOFF_MAX, jitter=True, retry_statuses=None, deadline=None):
+        self.attempts = attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_statuses = set(DEFAULT_RETRY_STATUSES if retry_statuses is None else retry_statuses)
+        self.deadline = deadline
+
+    @classmethod
+    def from_config(cls, scraper_config, deadline=None):
+        return cls(
+            attempts=scraper_config.get("retry_attempts", DEFAULT_RETRY_ATTEMPTS),
+            backoff_base=scraper_config.get("retry_backoff_base", DEFAULT_BACKOFF_BASE),
+            backoff_max=scraper_config.get("retry_backoff_max", DEFAULT_BACKOFF_MAX),
+            jitter=scraper_config.get("retry_jitter", True),
+            retry_statuses=scraper_config.get("retry_statuses"),
+            deadline=deadline
+        )
+
+    def remaining(self):
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def request_timeout(self, timeout):
+        # Never let a single request run past the deadline
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0:
+            raise Exception("Invocation deadline reached before the API request could be made")
+        return min(timeout, remaining)
+
+    def is_retryable(self, status_code):
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt):
+        # Exponential backoff with full jitter: uniform between 0 and base * 2^(attempt - 1)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def delay(self, attempt, response=None):
+        # A Retry-After on 429/503 replaces the computed backoff
+        if response is not None and response.status_code in RETRY_AFTER_STATUSES:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                return retry_after
+        return self.backoff(attempt)
+
+    def wait(self, attempt, response=None):
+        # Sleep before the next attempt, or fail now if the wait cannot finish in time
+        delay = self.delay(attempt, response)
+        if delay > self.backoff_max:
+            raise Exception(f"API asked to retry after {delay:.1f}s, longer than retry_backoff_max ({self.backoff_max}s)")
+        remaining = self.remaining()
+        if remaining is not None and delay >= remaining:
+            raise Exception(f"Not enough time left before the invocation deadline to retry "
+                            f"(need {delay:.1f}s, {max(remaining, 0):.1f}s left)")
+        print(f"Retrying in {delay:.2f}s (attempt {attempt + 1} of {self.attempts})")
+        time.sleep(delay)
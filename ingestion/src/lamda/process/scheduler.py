@@ -0,0 +1,143 @@
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+from .batch import DEFAULT_MAX_PER_HOST, DEFAULT_MAX_WORKERS, select_scrapers
+from .config_cache import CONFIG_FILE, list_scraper_configs
+from .http_session import configure_session
+
+# Seconds between runs for each named "frequency"; a number is taken as seconds
+FREQUENCIES = {
+    "minutely": 60,
+    "hourly": 3600,
+    "daily": 86400,
+    "weekly": 604800
+}
+
+# Run ids have one-second resolution, so a scraper cannot run more often than this
+MIN_FREQUENCY_SECONDS = 1
+
+# Longest the scheduler sleeps before checking the configuration for changes
+DEFAULT_POLL_SECONDS = 30.0
+
+def frequency_seconds(frequency):
+
+    if isinstance(frequency, (int, float)) and not isinstance(frequency, bool):
+        if frequency < MIN_FREQUENCY_SECONDS:
+            raise ValueError(f"Frequency must be at least {MIN_FREQUENCY_SECONDS} second: {frequency}")
+        return float(frequency)
+    if frequency in FREQUENCIES:
+        return float(FREQUENCIES[frequency])
+    raise ValueError(f"Unknown frequency: {frequency}")
+
+def new_run_scraper_id(now=None):
+
+    # Output files are named {scraper_name}_{run_scraper_id}, so a timestamp keeps every run apart
+    return (now or datetime.now()).strftime("%Y%m%d%H%M%S")
+
+
+class Scheduler:
+
+    # Runs every enabled scraper that has a "frequency" in one long-lived process, so the config
+    # index, HTTP connection pool and imported modules stay warm from one run to the next. A run
+    # that is still going when the scraper is due again is skipped rather than started twice.
+    def __init__(self, run_scraper, config_path=CONFIG_FILE, max_workers=DEFAULT_MAX_WORKERS,
+                 max_per_host=DEFAULT_MAX_PER_HOST, clock=time.monotonic):
+        self.run_scraper = run_scraper
+        self.config_path = config_path
+        self.max_per_host = max_per_host
+        self.clock = clock
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="scheduled")
+        self.next_run = {}
+        self.running = {}
+        self.skipped_runs = {}
+        self.scraper_configs = []
+        self.stopped = threading.Event()
+
+    def load(self):
+        # The config cache only re-reads the file when it changes; a broken edit keeps the last schedule
+        try:
+            scraper_configs, _ = select_scrapers(list_scraper_configs(self.config_path))
+        except Exception as e:
+            print(f"Error loading scraper configuration: {str(e)}")
+            return self.scraper_configs
+        scheduled = []
+        for scraper_config in scraper_configs:
+            if "frequency" not in scraper_config:
+                continue
+            try:
+                frequency_seconds(scraper_config["frequency"])
+            except ValueError as e:
+                print(f"Not scheduling {scraper_config['scraper_name']}: {str(e)}")
+                continue
+            scheduled.append(scraper_config)
+        if scheduled != self.scraper_configs:
+            hosts = {urlsplit(scraper_config.get("api_url", "")).netloc for scraper_config in scheduled}
+            configure_session(self.max_per_host, hosts=len(hosts))
+        self.scraper_configs = scheduled
+        return scheduled
+
+    def run(self, scraper_config, run_scraper_id):
+        scraper_name = scraper_config["scraper_name"]
+        try:
+            result = self.run_scraper(scraper_config, run_scraper_id)
+        except Exception as e:
+            result = {
+                "statusCode": 500,
+                "body": f"Error processing request: {str(e)}"
+            }
+        print(f"Scheduled run {scraper_name}_{run_scraper_id} finished with status {result['statusCode']}: {result['body']}")
+        return result
+
+    def tick(self, now=None):
+        # Start every scraper that is due and return the names started. New scrapers run at once.
+        now = self.clock() if now is None else now
+        started = []
+        for scraper_config in self.load():
+            scraper_name = scraper_config["scraper_name"]
+            due = self.next_run.get(scraper_name, now)
+            if due > now:
+                continue
+
+            # Fixed-rate schedule: a late tick does not push later runs back
+            interval = frequency_seconds(scraper_config["frequency"])
+            while due <= now:
+                due += interval
+            self.next_run[scraper_name] = due
+
+            running = self.running.get(scraper_name)
+            if running is not None and not running.done():
+                self.skipped_runs[scraper_name] = self.skipped_runs.get(scraper_name, 0) + 1
+                print(f"Skipping scheduled run of {scraper_name}: the previous run is still in progress")
+                continue
+            self.running[scraper_name] = self.executor.submit(self.run, scraper_config, new_run_scraper_id())
+            started.append(scraper_name)
+        return started
+
+    def seconds_until_next_run(self, poll_seconds=DEFAULT_POLL_SECONDS):
+        if not self.next_run:
+            return poll_seconds
+        return max(0.0, min(poll_seconds, min(self.next_run.values()) - self.clock()))
+
+    def run_forever(self, poll_seconds=DEFAULT_POLL_SECONDS):
+        print(f"Scheduler started with config {self.config_path}")
+        while not self.stopped.is_set():
+            self.tick()
+            self.stopped.wait(self.seconds_until_next_run(poll_seconds))
+        self.executor.shutdown(wait=True)
+        print("Scheduler stopped")
+
+    def stop(self, *_):
+        self.stopped.set()
+
+
+def run_scheduler(run_scraper, config_path=CONFIG_FILE, max_workers=DEFAULT_MAX_WORKERS,
+                  max_per_host=DEFAULT_MAX_PER_HOST, poll_seconds=DEFAULT_POLL_SECONDS):
+
+    # Runs until SIGINT or SIGTERM; scrapers already running are allowed to finish
+    scheduler = Scheduler(run_scraper, config_path, max_workers, max_per_host)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    scheduler.run_forever(poll_seconds)
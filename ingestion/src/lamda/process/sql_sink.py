@@ -0,0 +1,173 @@
+import re
+import sqlite3
+from operator import attrgetter
+from .records import OUTPUT_FIELDS
+
+# Values of the "sink" config key
+SQLITE_SINK = "sqlite"
+
+DEFAULT_SINK_PATH = "warehouse.sqlite"
+DEFAULT_SINK_TABLE = "employees"
+
+# SQL column types of the loaded employee table
+COLUMN_TYPES = {
+    "employee_id": "INTEGER PRIMARY KEY",
+    "full_name": "TEXT",
+    "email": "TEXT",
+    "phone": "TEXT",
+    "gender": "TEXT",
+    "age": "INTEGER",
+    "job_title": "TEXT",
+    "years_of_experience": "INTEGER",
+    "salary": "INTEGER",
+    "department": "TEXT",
+    "designation": "TEXT"
+}
+
+# Secondary indexes, built once the first load has finished rather than row by row during it
+INDEXED_COLUMNS = ["department", "designation", "email"]
+
+def sink_settings(scraper_config):
+
+    # (path, table), or None when the scraper only writes files
+    sink = scraper_config.get("sink")
+    if not sink:
+        return None
+    if sink != SQLITE_SINK:
+        raise ValueError(f"Unsupported sink: {sink}")
+    table = scraper_config.get("sink_table", DEFAULT_SINK_TABLE)
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+        raise ValueError(f"Invalid sink_table: {table}")
+    return scraper_config.get("sink_path", DEFAULT_SINK_PATH), table
+
+def open_sink(scraper_config):
+
+    # Delta runs also load their deletions, so the sink then takes a change_type column
+    settings = sink_settings(scraper_config)
+    return SqliteSink(*settings, delta=bool(scraper_config.get("delta"))) if settings else None
+
+def record_rows(records, columns):
+
+    # Row tuples in column order from slotted records, or from dicts such as the deleted rows
+    # of delta mode, which may carry only some of the columns
+    by_attribute = attrgetter(*columns)
+    return [tuple(map(record.get, columns)) if isinstance(record, dict) else by_attribute(record)
+            for record in records]
+
+
+class SqliteSink:
+
+    # Bulk-loads transformed batches into an SQLite database standing in for the warehouse.
+    # Every batch goes through a staging table and is upserted by employee_id; the whole run
+    # is one transaction, committed by close(). The aggregate table is kept current from each
+    # batch's old and new rows, so dashboards read it without ever scanning the employees.
+    def __init__(self, path, table=DEFAULT_SINK_TABLE, delta=False):
+        self.path = path
+        self.table = table
+        self.aggregates = f"{table}_aggregates"
+        self.delta = delta
+        self.columns = list(OUTPUT_FIELDS) + (["change_type"] if delta else [])
+        self.counts = {"upserted": 0, "deleted": 0}
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+        column_definitions = ", ".join(f"{name} {COLUMN_TYPES[name]}" for name in OUTPUT_FIELDS)
+        staging_columns = ", ".join(self.columns)
+        self.connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {table} ({column_definitions});
+            CREATE TABLE IF NOT EXISTS {self.aggregates} (
+                department TEXT, designation TEXT, employee_count INTEGER NOT NULL,
+                salary_sum REAL NOT NULL, avg_salary REAL,
+                PRIMARY KEY (department, designation));
+            CREATE VIEW IF NOT EXISTS {table}_by_department AS
+                SELECT department, SUM(employee_count) AS employee_count,
+                       CAST(SUM(salary_sum) AS REAL) / SUM(employee_count) AS avg_salary
+                FROM {self.aggregates} GROUP BY department;
+            CREATE VIEW IF NOT EXISTS {table}_by_designation AS
+                SELECT designation, SUM(employee_count) AS employee_count,
+                       CAST(SUM(salary_sum) AS REAL) / SUM(employee_count) AS avg_salary
+                FROM {self.aggregates} GROUP BY designation;
+            CREATE TEMP TABLE IF NOT EXISTS {table}_staging ({staging_columns});
+        """)
+        self.connection.execute("BEGIN")
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        table = self.table
+        staging = f"{table}_staging"
+        columns = ", ".join(OUTPUT_FIELDS)
+        placeholders = ", ".join("?" * len(self.columns))
+        execute = self.connection.execute
+        self.connection.executemany(f"INSERT INTO {staging} VALUES ({placeholders})", rows)
+
+        # The last row per employee_id wins, as it would in the output file
+        execute(f"DELETE FROM {staging} WHERE rowid NOT IN (SELECT MAX(rowid) FROM {staging} GROUP BY employee_id)")
+        upserts = f"SELECT * FROM {staging} WHERE change_type IS NOT 'delete'" if self.delta else f"SELECT * FROM {staging}"
+
+        # Take the rows being replaced or deleted out of the aggregates, then add the new ones
+        self.add_to_aggregates(f"SELECT IFNULL(e.department, ''), IFNULL(e.designation, ''), -COUNT(*), -TOTAL(e.salary) "
+                               f"FROM {staging} AS s JOIN {table} AS e USING (employee_id) GROUP BY 1, 2")
+        self.add_to_aggregates(f"SELECT IFNULL(department, ''), IFNULL(designation, ''), COUNT(*), TOTAL(salary) "
+                               f"FROM ({upserts}) GROUP BY 1, 2")
+
+        if self.delta:
+            self.counts["deleted"] += execute(
+                f"DELETE FROM {table} WHERE employee_id IN "
+                f"(SELECT employee_id FROM {staging} WHERE change_type = 'delete')").rowcount
+        updates = ", ".join(f"{name} = excluded.{name}" for name in OUTPUT_FIELDS if name != "employee_id")
+        self.counts["upserted"] += execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM ({upserts}) WHERE true "
+            f"ON CONFLICT (employee_id) DO UPDATE SET {updates}").rowcount
+        execute(f"DELETE FROM {staging}")
+
+    def add_to_aggregates(self, select):
+        self.connection.execute(
+            f"INSERT INTO {self.aggregates} (department, designation, employee_count, salary_sum) {select} "
+            f"ON CONFLICT (department, designation) DO UPDATE SET "
+            f"employee_count = employee_count + excluded.employee_count, salary_sum = salary_sum + excluded.salary_sum")
+
+    def write_records(self, records):
+        self.write_rows(record_rows(records, self.columns))
+
+    def close(self):
+        # Finish the aggregates and indexes inside the load transaction, then commit
+        self.connection.execute(f"DELETE FROM {self.aggregates} WHERE employee_count = 0")
+        self.connection.execute(f"UPDATE {self.aggregates} SET avg_salary = CAST(salary_sum AS REAL) / employee_count")
+        for column in INDEXED_COLUMNS:
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_{column} ON {self.table} ({column})")
+        row_count = self.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        self.connection.commit()
+        self.connection.close()
+        return dict(type=SQLITE_SINK, path=self.path, table=self.table, row_count=row_count, **self.counts)
+
+    def abort(self):
+        self.connection.rollback()
+        self.connection.close()
+
+
+class SinkWriter:
+
+    # Record writer that also loads every chunk into the sink. The sink commits just before
+    # the file is finished, so its summary can go into the file's metadata.
+    def __init__(self, writer, sink):
+        self.writer = writer
+        self.sink = sink
+        self.path = writer.path
+
+    @property
+    def record_count(self):
+        return self.writer.record_count
+
+    def write_records(self, records):
+        self.writer.write_records(records)
+        self.sink.write_records(records)
+
+    def close(self, metadata):
+        metadata["sink"] = self.sink.close()
+        self.writer.close(metadata)
+
+    def abort(self):
+        self.sink.abort()
+        self.writer.abort()
@@ -0,0 +1,74 @@
+import os
+import sys
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# process/ at the repository root is deployed into the process package next to the JSON processor
+import process
+PROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'process'))
+if PROCESS_DIR not in process.__path__:
+    process.__path__.append(PROCESS_DIR)
+
+pytest.importorskip("pyarrow")
+
+from process.arrow_reader import open_arrow_output, read_arrow_output
+from process.parquet_processor import transform_records_and_save_to_parquet
+
+def employee(employee_id, salary, department):
+    return {"id": employee_id, "first_name": "Ada", "last_name": str(employee_id), "email": f"{employee_id}@x.com",
+            "phone": "555-0100", "gender": "female", "age": 30, "job_title": "Engineer",
+            "years_of_experience": employee_id, "salary": salary, "department": department}
+
+EMPLOYEES = [employee(1, 100, "IT"), employee(2, 200, "HR"), employee(3, 300, "IT"), employee(4, 400, "Sales")]
+
+@pytest.fixture
+def arrow_file(tmp_path):
+    output_file = str(tmp_path / "parquet_100_1.arrow")
+    transform_records_and_save_to_parquet(EMPLOYEES, output_file, {"output_format": "arrow", "row_group_size": 3})
+    return output_file
+
+def test_arrow_writer_metadata(tmp_path):
+    output_file = str(tmp_path / "parquet_100_1.arrow")
+    metadata = transform_records_and_save_to_parquet(EMPLOYEES, output_file,
+                                                     {"output_format": "arrow", "row_group_size": 3})
+    assert metadata["record_count"] == 4
+    assert metadata["row_groups"] == 2
+    assert metadata["compression"] == "UNCOMPRESSED"
+    assert metadata["dictionary_columns"] == []
+    assert os.listdir(tmp_path) == ["parquet_100_1.arrow"]
+    table = open_arrow_output(output_file)
+    assert table.column_names == metadata["columns"]
+    assert table["department"].to_pylist() == ["IT", "HR", "IT", "Sales"]
+
+def test_projection(arrow_file):
+    table = read_arrow_output(arrow_file, columns=["employee_id", "salary"])
+    assert table.to_pydict() == {"employee_id": [1, 2, 3, 4], "salary": [100, 200, 300, 400]}
+
+@pytest.mark.parametrize("filters, expected", [
+    ([("salary", "==", 200)], [2]),
+    ([("salary", "!=", 200)], [1, 3, 4]),
+    ([("salary", "<", 200)], [1]),
+    ([("salary", "<=", 200)], [1, 2]),
+    ([("salary", ">", 300)], [4]),
+    ([("salary", ">=", 300)], [3, 4]),
+    ([("department", "in", ["HR", "Sales"])], [2, 4]),
+    ([("department", "not in", ["HR", "Sales"])], [1, 3]),
+    ([("department", "==", "IT"), ("salary", ">", 100)], [3])
+])
+def test_filters(arrow_file, filters, expected):
+    table = read_arrow_output(arrow_file, columns=["employee_id"], filters=filters)
+    assert table["employee_id"].to_pylist() == expected
+
+def test_unsupported_filter_operator(arrow_file):
+    with pytest.raises(ValueError):
+        read_arrow_output(arrow_file, filters=[("salary", "~", 1)])
+
+def test_reload_after_rewrite(arrow_file):
+    # Rewriting the file of the same run must leave the earlier table readable and map the new file
+    before = read_arrow_output(arrow_file, columns=["employee_id", "salary"])
+    transform_records_and_save_to_parquet([employee(9, 900, "IT")], arrow_file, {"output_format": "arrow"})
+    assert before.to_pydict() == {"employee_id": [1, 2, 3, 4], "salary": [100, 200, 300, 400]}
+    assert read_arrow_output(arrow_file, columns=["employee_id"]).to_pydict() == {"employee_id": [9]}
+    assert not os.path.exists(f"{arrow_file}.tmp")
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.batch import batch_response, run_batch, select_scrapers
+from process.http_session import DEFAULT_POOL_SIZE, configure_session, get_session
+
+CONFIGS = [
+    {"scraper_name": "json_100", "api_url": "https://api.example.com/a.json"},
+    {"scraper_name": "json_200", "api_url": "https://api.example.com/b.json", "enabled": False},
+    {"scraper_name": "json_300", "api_url": "https://other.example.com/c.json", "enabled": True}
+]
+
+def test_select_scrapers_skips_disabled_and_unknown_names():
+    selected, skipped = select_scrapers(CONFIGS)
+    assert [config["scraper_name"] for config in selected] == ["json_100", "json_300"]
+    assert skipped == {"json_200": "Scraper is disabled"}
+    
+    selected, skipped = select_scrapers(CONFIGS, ["json_300", "missing"])
+    assert [config["scraper_name"] for config in selected] == ["json_300"]
+    assert skipped == {"missing": "Scraper configuration not found"}
+    
+    # Repeated names run once, in the order they were first requested
+    selected, skipped = select_scrapers(CONFIGS, ["json_300", "json_100", "json_300", "missing", "missing"])
+    assert [config["scraper_name"] for config in selected] == ["json_300", "json_100"]
+    assert skipped == {"missing": "Scraper configuration not found"}
+
+def test_run_batch_overlaps_scrapers_and_reports_failures():
+    # Both scrapers have to be inside run_scraper at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    
+    def run_scraper(scraper_config):
+        barrier.wait()
+        if scraper_config["scraper_name"] == "json_300":
+            raise Exception("API request failed with status code: 500")
+        return {"statusCode": 200, "body": "ok"}
+    
+    results, elapsed_seconds = run_batch([CONFIGS[0], CONFIGS[2]], run_scraper, max_workers=2)
+    assert results["json_100"]["statusCode"] == 200
+    assert results["json_300"]["statusCode"] == 500
+    assert "status code: 500" in results["json_300"]["body"]
+    
+    response = batch_response(results, {"json_200": "Scraper is disabled"}, elapsed_seconds)
+    assert response["statusCode"] == 207
+    assert response["failed"] == ["json_300"]
+    assert response["body"] == "Processed 2 scrapers: 1 succeeded, 1 failed"
+    assert batch_response({"json_100": results["json_100"]}, {}, 0.0)["statusCode"] == 200
+
+def test_configure_session_caps_connections_per_host():
+    try:
+        session = configure_session(max_per_host=2, hosts=3)
+        assert session is get_session()
+        adapter = session.get_adapter("https://api.example.com/")
+        assert adapter._pool_maxsize == 2
+        assert adapter._pool_block is True
+        # Unchanged settings keep the mounted adapter and its open connections
+        assert configure_session(max_per_host=2, hosts=3).get_adapter("https://api.example.com/") is adapter
+    finally:
+        configure_session()
+    adapter = get_session().get_adapter("https://api.example.com/")
+    assert adapter._pool_maxsize == DEFAULT_POOL_SIZE
+    assert adapter._pool_block is False
+
+def test_run_batch_restores_the_session_pools():
+    before = get_session().get_adapter("https://api.example.com/")
+    batch_adapters = []
+    
+    def run_scraper(scraper_config):
+        adapter = get_session().get_adapter(scraper_config["api_url"])
+        adapter.poolmanager.connection_from_url(scraper_config["api_url"])
+        batch_adapters.append(adapter)
+        return {"statusCode": 200, "body": "ok"}
+    
+    run_batch([CONFIGS[0]], run_scraper, max_per_host=2)
+    batch_adapter = batch_adapters[0]
+    assert (batch_adapter._pool_maxsize, batch_adapter._pool_block) == (2, True)
+    
+    # Later single calls get the pools of before the batch; the batch's pools are closed
+    adapter = get_session().get_adapter("https://api.example.com/")
+    assert adapter is not batch_adapter
+    assert (adapter._pool_maxsize, adapter._pool_block) == (before._pool_maxsize, before._pool_block)
+    assert len(batch_adapter.poolmanager.pools) == 0
@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.dedup import DedupIndex, commit_dedup_index, dedup_settings
+from process.delta import commit_fingerprint_index
+from process.instrumentation import RunStats
+from process.json_processor import process_employee_data
+
+def employee(employee_id, email, age=30, phone="555-0100"):
+    return {"id": employee_id, "first_name": "Ada", "last_name": str(employee_id), "email": email, "phone": phone,
+            "gender": "female", "age": age, "job_title": "Engineer", "years_of_experience": 2, "salary": 100,
+            "department": "IT"}
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "json_100_dedup.sqlite")
+
+def test_dedup_settings():
+    assert dedup_settings({"scraper_name": "json_100"}) is None
+    assert dedup_settings({"scraper_name": "json_100", "dedup": True}) == \
+        ("json_100_dedup.sqlite", "drop", ["employee_id", "email"])
+    with pytest.raises(ValueError):
+        dedup_settings({"dedup": "merge"})
+    with pytest.raises(ValueError):
+        dedup_settings({"dedup": True, "dedup_keys": ["phone"]})
+
+def test_duplicates_within_and_across_runs(index_path):
+    stats = RunStats()
+    index = DedupIndex(index_path, "json_100_1.json")
+    # A repeated id in the same batch, then a repeated email (case-insensitive) in a later batch
+    assert index.apply({"employee_id": [1, 2, 1], "email": ["a@x.com", "b@x.com", "c@x.com"]}, stats) == [True, True, False]
+    assert index.apply({"employee_id": [3, 4], "email": [" B@X.com", ""]}, stats) == [False, True]
+    index.save_pending()
+    commit_dedup_index(index_path, "json_100_1.json")
+    assert stats.skip_reasons == {"duplicate_in_run": 2}
+    
+    index = DedupIndex(index_path, "json_100_2.json")
+    assert index.classify({"employee_id": [1, 5, 6], "email": ["z@x.com", "e@x.com", "a@x.com"]}) == \
+        ["duplicate_across_runs", None, "duplicate_across_runs"]
+    # Never committed, so its keys do not count for the next run
+    index.save_pending()
+    
+    index = DedupIndex(index_path, "json_100_3.json", mode="flag")
+    assert index.apply({"employee_id": [5, 2], "email": ["e@x.com", "b@x.com"]}, RunStats()) == [True, True]
+    assert index.summary()["unique"] == 1
+    assert index.summary()["duplicate_across_runs"] == 1
+    index.abort()
+
+def test_rerun_of_the_same_run_drops_nothing(index_path):
+    for _ in range(2):
+        index = DedupIndex(index_path, "json_100_1.json")
+        assert index.classify({"employee_id": [1, 2], "email": ["a@x.com", "b@x.com"]}) == [None, None]
+        index.save_pending()
+        commit_dedup_index(index_path, "json_100_1.json")
+
+def test_json_processor_reports_validation(tmp_path, index_path):
+    source = tmp_path / "employees.json"
+    source.write_text(json.dumps({"data": [employee(1, "a@x.com"), employee(1, "b@x.com"),
+                                           employee(2, "", age=0, phone="555-0100x12")]}))
+    scraper_config = {"scraper_name": "json_100", "source": "file", "source_path": str(source),
+                      "dedup": True, "dedup_index_path": index_path}
+    result = process_employee_data(scraper_config, str(tmp_path / "json_100_1.json"))
+    assert [record["employee_id"] for record in result["data"]] == [1, 2]
+    validation = result["metadata"]["validation"]
+    assert validation["duplicate_in_run"] == 1
+    assert validation["invalid_phone"] == 1
+    assert validation["missing_email"] == 1
+    assert validation["zero_age"] == 1
+
+def test_records_without_an_id_are_counted_not_dropped(tmp_path, index_path):
+    source = tmp_path / "employees.json"
+    records = [employee(1, f"{n}@x.com") for n in range(3)]
+    for record in records:
+        del record["id"]
+    source.write_text(json.dumps({"data": records}))
+    scraper_config = {"scraper_name": "json_100", "source": "file", "source_path": str(source),
+                      "dedup": True, "dedup_index_path": index_path}
+    result = process_employee_data(scraper_config, str(tmp_path / "json_100_1.json"))
+    assert len(result["data"]) == 3
+    validation = result["metadata"]["validation"]
+    assert validation["missing_employee_id"] == 3
+    assert validation["duplicate_in_run"] == 0
+
+def test_delta_run_keeps_duplicates_of_earlier_runs(tmp_path, index_path):
+    source = tmp_path / "employees.json"
+    source.write_text(json.dumps({"data": [employee(1, "a@x.com"), employee(2, "b@x.com"), employee(2, "c@x.com")]}))
+    scraper_config = {"scraper_name": "json_100", "source": "file", "source_path": str(source),
+                      "dedup": True, "dedup_index_path": index_path,
+                      "delta": True, "fingerprint_index_path": str(tmp_path / "json_100_fingerprints.bin")}
+    for run in ("json_100_1.json", "json_100_2.json"):
+        result = process_employee_data(scraper_config, str(tmp_path / run))
+        commit_fingerprint_index(scraper_config["fingerprint_index_path"])
+        commit_dedup_index(index_path, str(tmp_path / run))
+    
+    # The second run sees identical data: nothing changed, nothing deleted
+    assert result["data"] == []
+    assert result["metadata"]["delta"]["delete"] == 0
+    assert result["metadata"]["delta"]["unchanged"] == 2
+    validation = result["metadata"]["validation"]
+    assert validation["duplicate_across_runs"] == 2
+    assert validation["duplicate_in_run"] == 1
+    assert validation["keep_across_runs"] is True
@@ -0,0 +1,42 @@
+import os
+import sys
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.delta import (DeltaTracker, commit_fingerprint_index, delta_records, fingerprint,
+                           load_fingerprint_index, write_fingerprint_index)
+
+def employee(employee_id, salary):
+    return {"employee_id": employee_id, "full_name": f"Employee {employee_id}", "salary": salary}
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "json_100_fingerprints.bin")
+
+def test_fingerprint_index_round_trip(index_path):
+    index = {1: fingerprint([1, "a"]), 2**40: fingerprint([2, "b"])}
+    write_fingerprint_index(index_path, index)
+    assert load_fingerprint_index(index_path) == index
+    assert load_fingerprint_index(index_path + ".missing") == {}
+
+def test_delta_records_between_runs(index_path):
+    first_run = [employee(1, 100), employee(2, 200), employee(3, 300)]
+    tracker = DeltaTracker(index_path)
+    delta = delta_records(first_run, tracker)
+    assert [row["change_type"] for row in delta] == ["insert", "insert", "insert"]
+    tracker.save_pending()
+    
+    # Nothing is committed until the output has been written
+    assert load_fingerprint_index(index_path) == {}
+    commit_fingerprint_index(index_path)
+    
+    second_run = [employee(1, 100), employee(2, 250), employee(4, 400)]
+    tracker = DeltaTracker(index_path)
+    delta = delta_records(second_run, tracker)
+    changes = {row["employee_id"]: row["change_type"] for row in delta}
+    assert changes == {2: "update", 4: "insert", 3: "delete"}
+    deleted = [row for row in delta if row["change_type"] == "delete"][0]
+    assert deleted["salary"] is None and deleted["full_name"] is None
+    assert tracker.summary()["unchanged"] == 1
@@ -0,0 +1,76 @@
+import gzip
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.fetch import accept_encoding, fetch, transfer_metadata
+from process.json_processor import process_employee_data
+
+EMPLOYEES = {"data": [{"id": employee_id, "first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com",
+                       "phone": "555-0100", "gender": "female", "age": 36, "job_title": "Engineer",
+                       "years_of_experience": 4, "salary": 100, "department": "IT"}
+                      for employee_id in range(1, 2001)]}
+
+
+class GzipHandler(BaseHTTPRequestHandler):
+
+    # Serves EMPLOYEES gzip-compressed when the client accepts it, and records what it asked for
+    accept_encodings = []
+
+    def do_GET(self):
+        body = json.dumps(EMPLOYEES).encode()
+        accepted = self.headers.get("Accept-Encoding", "")
+        GzipHandler.accept_encodings.append(accepted)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in accepted:
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def api_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GzipHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/employees.json"
+    server.shutdown()
+
+def test_accept_encoding_offers_only_decodable_encodings():
+    assert accept_encoding({}).startswith(("zstd", "br", "gzip"))
+    assert accept_encoding({"accept_encoding": ["gzip"]}) == "gzip"
+    assert accept_encoding({"accept_encoding": ["lzma"]}) == "identity"
+    assert "zstd" not in accept_encoding({"http2": True})
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_compressed_transfer_is_decoded(api_url, stream):
+    response = fetch(api_url, {}, timeout=5, stream=stream)
+    body = b"".join(response.iter_content(8192)) if stream else response.content
+    response.close()
+    assert json.loads(body) == EMPLOYEES
+    transfer = transfer_metadata(response, {}, len(body))
+    assert transfer["content_encoding"] == "gzip"
+    assert transfer["http_version"] == "HTTP/1.1"
+    assert transfer["wire_bytes"] < transfer["decoded_bytes"] / 5
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_processor_reports_transfer(api_url, stream):
+    scraper_config = {"scraper_name": "json_100", "api_url": api_url, "stream": stream,
+                      "accept_encoding": ["identity"]}
+    result = process_employee_data(scraper_config)
+    assert len(result["data"]) == 2000
+    transfer = result["metadata"]["transfer"]
+    assert GzipHandler.accept_encodings[-1] == "identity"
+    assert transfer["content_encoding"] == "identity"
+    assert transfer["wire_bytes"] == transfer["decoded_bytes"] == len(json.dumps(EMPLOYEES).encode())
@@ -0,0 +1,46 @@
+import os
+import sys
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.field_mapping import compile_field_plan, find_employee_records, resolve_field_mapping
+from process.json_processor import transform_employee_records
+
+def camel_case_employee(employee_id):
+    return {"id": employee_id, "firstName": "Ada", "lastName": "Lovelace", "email": "ada@example.com",
+            "phoneNumber": "555-0100", "gender": "female", "age": "36", "jobTitle": "Analyst",
+            "experience": 4, "salary": "5000.75", "department": "Research"}
+
+def test_plan_resolves_aliases_from_sample_record():
+    plan = compile_field_plan(None, camel_case_employee(1))
+    assert plan.keys[plan.fields.index("first_name")] == "firstName"
+    assert plan.keys[plan.fields.index("years_of_experience")] == "experience"
+    assert plan.extract(camel_case_employee(7))[0] == 7
+
+def test_plan_falls_back_to_aliases_for_irregular_records():
+    plan = compile_field_plan(None, camel_case_employee(1))
+    irregular = {"id": 2, "first_name": "Grace", "age": 40}
+    values = dict(zip(plan.fields, plan.extract(irregular)))
+    assert values["first_name"] == "Grace"
+    assert values["last_name"] == ""
+    assert values["salary"] == 0
+
+def test_field_mapping_override():
+    records = [{"employeeId": 9, "first_name": "Alan", "last_name": "Turing", "salary": 7000}]
+    transformed = transform_employee_records(records, {"employee_id": "employeeId", "salary": {"type": "int"}})
+    assert transformed[0]["employee_id"] == 9
+    assert transformed[0]["full_name"] == "Alan Turing"
+    assert transformed[0]["salary"] == 7000
+
+def test_invalid_field_mapping():
+    with pytest.raises(ValueError):
+        resolve_field_mapping({"nickname": ["nick"]})
+    with pytest.raises(ValueError):
+        resolve_field_mapping({"age": {"type": "decimal"}})
+
+def test_find_employee_records_infers_list_key():
+    assert find_employee_records({"results": [{"id": 1}]}) == [{"id": 1}]
+    with pytest.raises(ValueError):
+        find_employee_records({"count": 0})
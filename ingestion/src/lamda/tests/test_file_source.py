@@ -0,0 +1,50 @@
+import gzip
+import json
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.file_source import iter_source_records, source_files
+from process.json_processor import process_employee_data
+
+RAW_RECORDS = [{"id": i, "first_name": "Test", "last_name": f"User {i}", "phone": "555"} for i in range(6)]
+
+@pytest.fixture
+def dump_dir(tmp_path):
+    with open(tmp_path / "a.json", 'w') as file:
+        json.dump({"data": RAW_RECORDS[:2]}, file)
+    with gzip.open(tmp_path / "b.ndjson.gz", 'wt') as file:
+        file.write("\n".join(json.dumps(record) for record in RAW_RECORDS[2:4]) + "\n\n")
+    with open(tmp_path / "c.jsonl", 'w') as file:
+        file.write("\n".join(json.dumps(record) for record in RAW_RECORDS[4:]))
+    with open(tmp_path / "notes.txt", 'w') as file:
+        file.write("not a dump")
+    return tmp_path
+
+def test_directory_is_read_in_name_order(dump_dir):
+    assert [os.path.basename(path) for path in source_files(str(dump_dir))] == ["a.json", "b.ndjson.gz", "c.jsonl"]
+    assert list(iter_source_records({"source_path": str(dump_dir)})) == RAW_RECORDS
+    assert list(iter_source_records({"source_path": str(dump_dir), "stream": True})) == RAW_RECORDS
+
+def test_file_source_skips_http(dump_dir):
+    config = {"scraper_name": "json_100", "source": "file", "source_path": str(dump_dir)}
+    with patch('requests.Session.get') as mock_get:
+        result = process_employee_data(config)
+    mock_get.assert_not_called()
+    assert [record["employee_id"] for record in result["data"]] == list(range(6))
+    assert result["metadata"]["source_type"] == "file"
+
+def test_json_file_path_is_accepted():
+    json_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'json_100_100.json'))
+    result = process_employee_data({"source": "file", "json_file_path": json_path})
+    assert result["metadata"]["record_count"] == 320
+
+def test_missing_source(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_source_records({"source_path": str(tmp_path / "missing.json")}))
+    with pytest.raises(ValueError):
+        list(iter_source_records({"source_path": str(tmp_path)}))
@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The benchmark data generator lives in benchmarks/ at the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'benchmarks')))
+
+from generate_data import BAD_ROW_RATIO, CAMEL_CASE_RATIO, generate_records, write_api_response
+from process.field_mapping import find_employee_records
+
+FIELDS = {"id", "first_name", "last_name", "email", "phone", "gender", "age", "job_title", "years_of_experience",
+          "salary", "department"}
+CAMEL_CASE_FIELDS = {"firstName", "lastName", "phoneNumber", "jobTitle", "experience"}
+
+def is_broken(record):
+    return (record["age"] == "unknown" or not isinstance(record["salary"], int)
+            or "department" not in record)
+
+def test_records_are_deterministic_and_shaped_like_the_api():
+    records = list(generate_records(5000))
+    assert records == list(generate_records(5000))
+    assert records != list(generate_records(5000, seed=1))
+    assert [record["id"] for record in records] == list(range(1, 5001))
+    assert len({record["email"] for record in records}) == 5000
+    for record in records:
+        keys = set(record)
+        if "firstName" in keys:
+            keys = keys - CAMEL_CASE_FIELDS | {"first_name", "last_name", "phone", "job_title", "years_of_experience"}
+        assert keys | {"department"} == FIELDS
+    
+    # The mix of camelCase aliases and broken rows stays near the configured ratios
+    camel_case = sum("firstName" in record for record in records) / len(records)
+    broken = sum(is_broken(record) for record in records) / len(records)
+    assert abs(camel_case - CAMEL_CASE_RATIO) < 0.02
+    assert 0 < broken < 2 * BAD_ROW_RATIO
+    assert any("x" in str(record.get("phone", record.get("phoneNumber"))) for record in records)
+
+def test_api_response_file_round_trip(tmp_path):
+    path = write_api_response(str(tmp_path / "employees.json"), 25, batch_size=10)
+    with open(path, 'r') as file:
+        assert find_employee_records(json.load(file)) == list(generate_records(25))
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.instrumentation import RunStats
+from process.json_processor import transform_employee_records
+
+def slow_chunks():
+    for chunk in [b"ab", b"cde"]:
+        time.sleep(0.02)
+        yield chunk
+
+def test_nested_stage_time_is_not_counted_twice():
+    stats = RunStats()
+    chunks = stats.timed_iter(slow_chunks(), "fetch", measure_bytes=True)
+    with stats.stage("parse", exclude=("fetch",)):
+        assert list(chunks) == [b"ab", b"cde"]
+    report = stats.as_dict()
+    assert report["stages"]["fetch"]["bytes"] == 5
+    assert report["stages"]["fetch"]["seconds"] >= 0.04
+    assert report["stages"]["parse"]["seconds"] < 0.02
+
+def test_skipped_records_are_counted_by_reason(capsys):
+    stats = RunStats()
+    records = [
+        {"id": 1, "first_name": "Ada", "age": 36, "salary": 100},
+        {"id": 2, "first_name": "Bad", "age": "unknown", "salary": 100},
+        {"id": 3, "first_name": "Bad", "age": 40, "salary": None},
+        {"id": "x", "first_name": "Bad", "age": "unknown", "salary": None}
+    ]
+    transformed = transform_employee_records(records, stats=stats)
+    assert [record["employee_id"] for record in transformed] == [1]
+    report = stats.as_dict()
+    assert report["records_in"] == 4
+    assert report["records_skipped"] == 3
+    assert report["skip_reasons"] == {"invalid_age": 1, "invalid_salary": 1, "invalid_employee_id": 1}
+    # One aggregated line instead of one line per bad record
+    assert capsys.readouterr().out.count("Skipped 3 invalid employee records") == 1
+
+def test_merge_worker_stats():
+    worker = RunStats()
+    worker.add_time("transform", 0.5)
+    worker.count("records_written", 10)
+    worker.skip("invalid_age", 2)
+    stats = RunStats()
+    stats.count("records_written", 5)
+    stats.merge(worker.as_dict())
+    report = stats.as_dict()
+    assert report["records_written"] == 15
+    assert report["records_skipped"] == 2
+    assert report["stages"]["transform"]["seconds"] == 0.5
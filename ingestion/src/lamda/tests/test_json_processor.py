@@ -7,7 +7,9 @@ from unittest.mock import patch, MagicMock
 # Add the parent directory to sys.path to import modules properly
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from process.json_processor import process_employee_data, transform_employee_data
+from process import json_writer
+from process.field_mapping import find_employee_records
+from process.json_processor import process_employee_data, transform_employee_data, transform_employee_records
 
 @pytest.fixture
 def scraper_config():
@@ -91,7 +93,7 @@ def test_handle_missing_invalid_data():
     assert transformed_data[0]["full_name"] == "Partial"
     assert transformed_data[0]["years_of_experience"] == 0
     assert transformed_data[0]["designation"] == "system engineer"
-@patch('requests.get')
+@patch('requests.Session.get')
 def test_json_file_download(mock_get, scraper_config):
     # Create a mock response
     mock_response = MagicMock()
@@ -109,3 +111,132 @@ def test_json_file_download(mock_get, scraper_config):
     assert result is not None
     assert "data" in result
     assert len(result["data"]) > 0
+
+def make_response(status_code, body=b"", headers=None):
+    mock_response = MagicMock()
+    mock_response.status_code = status_code
+    mock_response.content = body
+    mock_response.json.side_effect = lambda: json.loads(body)
+    mock_response.headers = headers or {}
+    return mock_response
+
+@pytest.fixture
+def conditional_config(tmp_path):
+    return {
+        "scraper_id": "100",
+        "scraper_name": "json_100",
+        "api_url": "https://example.com/employees.json",
+        "conditional_fetch": True,
+        "validator_cache_path": str(tmp_path / "validator_cache.json")
+    }
+
+def test_conditional_fetch_reuses_output_on_not_modified(conditional_config, tmp_path):
+    from process.fetch import accept_encoding
+    from process.http_cache import save_validators
+    
+    body = json.dumps({"data": [{"id": 1, "first_name": "Test"}]}).encode()
+    with patch('requests.Session.get', return_value=make_response(200, body, {"ETag": '"v1"'})):
+        result = process_employee_data(conditional_config)
+    assert result["metadata"]["cache_hit"] is False
+    assert result["metadata"]["validators"]["etag"] == '"v1"'
+    
+    # Store the validators the way the handler does after writing its output
+    previous_output = tmp_path / "json_100_1.json"
+    previous_output.write_text("{}")
+    save_validators(conditional_config["validator_cache_path"], conditional_config, conditional_config["api_url"],
+                    result["metadata"]["validators"], str(previous_output), 1)
+    
+    with patch('requests.Session.get', return_value=make_response(304)) as mock_get:
+        result = process_employee_data(conditional_config)
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"',
+                                                    "Accept-Encoding": accept_encoding(conditional_config)}
+    assert result["metadata"]["cache_hit"] is True
+    assert result["metadata"]["cache_reason"] == "not_modified"
+    assert result["metadata"]["output_file"] == str(previous_output)
+    assert result["data"] is None
+
+def test_conditional_fetch_reuses_output_on_identical_content(conditional_config, tmp_path):
+    from process.http_cache import content_hash, save_validators
+    
+    body = json.dumps({"data": [{"id": 1, "first_name": "Test"}]}).encode()
+    previous_output = tmp_path / "json_100_1.json"
+    previous_output.write_text("{}")
+    save_validators(conditional_config["validator_cache_path"], conditional_config, conditional_config["api_url"],
+                    {"etag": None, "last_modified": None, "content_hash": content_hash(body)}, str(previous_output), 1)
+    
+    # Server ignores validators but returns the same bytes
+    with patch('requests.Session.get', return_value=make_response(200, body)):
+        result = process_employee_data(conditional_config)
+    assert result["metadata"]["cache_hit"] is True
+    assert result["metadata"]["cache_reason"] == "content_unchanged"
+    
+    # A missing previous output forces a full run
+    previous_output.unlink()
+    with patch('requests.Session.get', return_value=make_response(200, body)):
+        result = process_employee_data(conditional_config)
+    assert result["metadata"]["cache_hit"] is False
+    assert len(result["data"]) == 1
+
+def test_validator_cache_is_per_scraper_and_settings(conditional_config, tmp_path):
+    from process.http_cache import load_validators, save_validators, validator_cache_path
+    
+    cache_path = conditional_config["validator_cache_path"]
+    api_url = conditional_config["api_url"]
+    previous_output = tmp_path / "json_100_1.json"
+    previous_output.write_text("{}")
+    save_validators(cache_path, conditional_config, api_url, {"etag": '"v1"'}, str(previous_output), 1)
+    assert load_validators(cache_path, conditional_config, api_url)["etag"] == '"v1"'
+    
+    # Another scraper on the same API, or the same scraper with other output settings, starts afresh
+    other_scraper = dict(conditional_config, scraper_name="json_200", output_format="ndjson")
+    assert load_validators(cache_path, other_scraper, api_url) is None
+    assert load_validators(cache_path, dict(conditional_config, output_compression="gzip"), api_url) is None
+    
+    # Delta runs never reuse an earlier output
+    assert validator_cache_path(dict(conditional_config, delta=True)) is None
+
+def test_pipeline_mode_writes_output_file(sample_raw_data, tmp_path):
+    body = json.dumps({"data": [{"id": i, "first_name": "Test", "phone": "1x2"} for i in range(25)]}).encode()
+    output_file = tmp_path / "json_100_1.json"
+    config = {"scraper_name": "json_100", "pipeline": True, "batch_size": 4, "queue_size": 1}
+    
+    with patch('requests.Session.get', return_value=make_response(200, body)):
+        result = process_employee_data(config, str(output_file))
+    
+    # The file is already written, so no data is handed back to the caller
+    assert result["data"] is None
+    with open(output_file, 'r') as file:
+        written = json.load(file)
+    assert written["metadata"]["record_count"] == 25
+    assert written["data"] == transform_employee_data(json.loads(body))
+
+def test_stream_mode_writes_output_file_and_hashes_whole_body(conditional_config, tmp_path):
+    from process.http_cache import content_hash
+    
+    raw_data = {"data": [{"id": i, "first_name": "Test"} for i in range(25)], "total": 25, "next": None}
+    body = json.dumps(raw_data).encode()
+    response = make_response(200, body)
+    response.iter_content.side_effect = lambda chunk_size: (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+    output_file = tmp_path / "json_100_1.json"
+    config = dict(conditional_config, stream=True, chunk_size=64, batch_size=4)
+    
+    with patch('requests.Session.get', return_value=response):
+        result = process_employee_data(config, str(output_file))
+    
+    # The records never come back as a list, and the trailing keys are part of the hash
+    assert result["data"] is None
+    with open(output_file, 'r') as file:
+        assert json.load(file)["data"] == transform_employee_data(raw_data)
+    assert result["metadata"]["validators"]["content_hash"] == content_hash(body)
+    assert result["metadata"]["transfer"]["decoded_bytes"] == len(body)
+
+def test_transformed_records_are_slotted(sample_raw_data):
+    record = transform_employee_records(find_employee_records(sample_raw_data))[0]
+    assert not hasattr(record, "__dict__")
+    assert record["employee_id"] == record.employee_id
+    assert sys.getsizeof(record) < sys.getsizeof(record.as_dict()) / 2
+    
+    # Records serialise like their dict, with orjson and with the json fallback
+    assert json.loads(json_writer.dumps(record)) == record.as_dict()
+    with patch.object(json_writer, "orjson", None):
+        assert json.loads(json_writer.dumps(record)) == record.as_dict()
@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.field_mapping import find_employee_records
+from process.json_stream import iter_employee_records
+from process.json_processor import transform_employee_data, transform_employee_records
+from process.records import as_dicts
+
+def chunked(text, size):
+    # Split a JSON document into byte chunks, cutting through tokens and records on purpose
+    data = text.encode("utf-8")
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.fixture
+def sample_raw_data():
+    json_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'json_100_100.json'))
+    with open(json_path, 'r') as file:
+        return json.load(file)
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_stream_matches_full_parse(sample_raw_data, chunk_size):
+    # Streaming the document must yield exactly the records of the "data" array
+    records = list(iter_employee_records(chunked(json.dumps(sample_raw_data), chunk_size)))
+    assert records == sample_raw_data["data"]
+
+def test_stream_transform_matches_list_transform(sample_raw_data):
+    streamed = transform_employee_records(iter_employee_records(chunked(json.dumps(sample_raw_data), 64)))
+    assert as_dicts(streamed) == transform_employee_data(sample_raw_data)
+
+def test_stream_record_discovery():
+    # Direct list, known keys after metadata, and the "any list of dicts" fallback
+    employee = {"id": 7, "first_name": "Ünï", "salary": 1200.5}
+    assert list(iter_employee_records(chunked(json.dumps([employee]), 3))) == [employee]
+    payload = {"success": True, "offset": 12345, "users": [employee, employee]}
+    assert list(iter_employee_records(chunked(json.dumps(payload), 5))) == [employee, employee]
+    payload = {"total": 1, "people": [employee]}
+    assert list(iter_employee_records(chunked(json.dumps(payload), 2))) == [employee]
+
+def test_stream_without_employee_data():
+    with pytest.raises(ValueError):
+        list(iter_employee_records(chunked(json.dumps({"success": False, "message": "nope"}), 4)))
+    with pytest.raises(ValueError):
+        list(iter_employee_records(chunked('{"data": [{"id": 1}, {"id": 2', 4)))
+
+@pytest.mark.parametrize("payload", [
+    {"employees": [{"id": 1}], "data": [{"id": 2}]},
+    {"employees": [], "people": [{"id": 1}]},
+    {"tags": ["a", "b"], "records": [{"id": 1}, {"id": 2}]},
+    {"users": [3, 4], "records": [{"id": 1}]}
+])
+def test_stream_and_full_parse_pick_the_same_records(payload):
+    assert list(iter_employee_records(chunked(json.dumps(payload), 3))) == find_employee_records(payload)
+
+def test_full_parse_prefers_known_keys_over_document_order():
+    # The stream takes the first candidate array it meets; the full parse keeps the key priority
+    payload = {"links": [{"rel": "self"}], "data": [{"id": 1}], "employees": [{"id": 2}]}
+    assert find_employee_records(payload) == [{"id": 2}]
+    assert list(iter_employee_records(chunked(json.dumps(payload), 3))) == [{"rel": "self"}]
+
+@pytest.mark.parametrize("payload", [[], {"data": []}, {"employees": [], "tags": ["a"]}])
+def test_empty_record_arrays_are_rejected_in_both_modes(payload):
+    with pytest.raises(ValueError):
+        find_employee_records(payload)
+    with pytest.raises(ValueError):
+        list(iter_employee_records(chunked(json.dumps(payload), 3)))
+
+def test_stream_does_not_buffer_records_under_other_keys():
+    # The first record comes out after a couple of chunks, not after the whole array
+    consumed = []
+    chunks = chunked(json.dumps({"total": 5000, "records": [{"id": n} for n in range(5000)]}), 1024)
+    records = iter_employee_records(consumed.append(chunk) or chunk for chunk in chunks)
+    assert next(records) == {"id": 0}
+    assert len(consumed) <= 2
+    assert sum(1 for _ in records) == 4999
@@ -0,0 +1,65 @@
+import gzip
+import json
+import os
+import sys
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.json_writer import metadata_path, open_record_writer, output_extension, write_json_output
+
+RECORDS = [{"employee_id": i, "full_name": f"Employee {i}", "salary": 1000 * i} for i in range(7)]
+METADATA = {"record_count": len(RECORDS), "source": "test"}
+
+def test_output_extension():
+    assert output_extension({}) == ".json"
+    assert output_extension({"output_format": "ndjson", "compression": "gzip"}) == ".ndjson.gz"
+    with pytest.raises(ValueError):
+        output_extension({"output_format": "xml"})
+    with pytest.raises(ValueError):
+        output_extension({"compression": "lz4"})
+
+def test_compact_json_gzip_round_trip(tmp_path):
+    path = str(tmp_path / "json_100_1.json.gz")
+    config = {"compression": "gzip", "batch_size": 3}
+    assert write_json_output(path, RECORDS, METADATA, config) == len(RECORDS)
+    with gzip.open(path, 'rt') as file:
+        written = json.load(file)
+    assert written == {"data": RECORDS, "metadata": METADATA}
+
+def test_ndjson_writes_records_and_metadata_file(tmp_path):
+    path = str(tmp_path / "json_100_1.ndjson")
+    writer = open_record_writer(path, {"output_format": "ndjson"})
+    writer.write_records(RECORDS[:4])
+    writer.write_records([])
+    writer.write_records(RECORDS[4:])
+    writer.close(METADATA)
+    with open(path, 'r') as file:
+        assert [json.loads(line) for line in file] == RECORDS
+    with open(metadata_path(path), 'r') as file:
+        assert json.load(file) == METADATA
+
+def test_zstd_round_trip(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = str(tmp_path / "json_100_1.ndjson.zst")
+    write_json_output(path, RECORDS, METADATA, {"output_format": "ndjson", "compression": "zstd"})
+    with open(path, 'rb') as file:
+        lines = zstandard.ZstdDecompressor().stream_reader(file).read().splitlines()
+    assert [json.loads(line) for line in lines] == RECORDS
+
+def test_integers_beyond_64_bits_are_written(tmp_path):
+    path = str(tmp_path / "json_100_1.json")
+    records = [{"employee_id": 2 ** 64, "full_name": "Employee 0"}, {"employee_id": -2 ** 70, "full_name": "Employee 1"}]
+    write_json_output(path, records, METADATA)
+    with open(path, 'r') as file:
+        assert json.load(file)["data"] == records
+
+def test_compression_level_zero_is_honoured(tmp_path):
+    sizes = {}
+    for level in (0, 9):
+        path = str(tmp_path / f"json_100_{level}.json.gz")
+        write_json_output(path, RECORDS * 50, METADATA, {"compression": "gzip", "compression_level": level})
+        sizes[level] = os.path.getsize(path)
+    # Level 0 stores the data uncompressed
+    assert sizes[0] > 3 * sizes[9]
@@ -0,0 +1,248 @@
+import os
+import sys
+import threading
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# process/ at the repository root is deployed into the process package next to the JSON processor
+import process
+PROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'process'))
+if PROCESS_DIR not in process.__path__:
+    process.__path__.append(PROCESS_DIR)
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from process.instrumentation import RunStats
+from process.parquet_processor import (DEFAULT_DICTIONARY_COLUMNS, employee_schema, transform_employee_batch,
+                                       transform_records_and_save_to_parquet)
+
+def employee(employee_id, salary=100, **fields):
+    record = {"id": employee_id, "first_name": "Ada", "last_name": str(employee_id), "email": f"{employee_id}@x.com",
+              "phone": "555-0100", "gender": "female", "age": 30, "job_title": "Engineer",
+              "years_of_experience": 4, "salary": salary, "department": "IT"}
+    record.update(fields)
+    return record
+
+def row_loop_transform(employees):
+    # The per-record loop the columnar transform replaced, kept as the reference for its output
+    transformed = []
+    for employee in employees:
+        try:
+            employee_id = int(employee.get("id", 0))
+            first_name = str(employee.get("first_name", employee.get("firstName", "")))
+            last_name = str(employee.get("last_name", employee.get("lastName", "")))
+            phone = str(employee.get("phone", employee.get("phoneNumber", "")))
+            age = int(employee.get("age", 0))
+            years_of_experience = int(employee.get("years_of_experience", employee.get("experience", 0)))
+            salary = int(float(employee.get("salary", 0)))
+        except (ValueError, TypeError):
+            continue
+        # The loop wrote salaries outside int64 as garbage; the columnar transform skips them
+        if not -2 ** 63 <= salary < 2 ** 63:
+            continue
+        if years_of_experience < 3:
+            designation = "system engineer"
+        elif years_of_experience <= 5:
+            designation = "data engineer"
+        elif years_of_experience <= 10:
+            designation = "senior data engineer"
+        else:
+            designation = "lead"
+        phone_valid = 'x' not in phone if phone else True
+        transformed.append({
+            "employee_id": employee_id,
+            "full_name": f"{first_name} {last_name}".strip(),
+            "email": str(employee.get("email", "")),
+            "phone": phone if phone_valid else "Invalid Number",
+            "gender": str(employee.get("gender", "")),
+            "age": age,
+            "job_title": str(employee.get("job_title", employee.get("jobTitle", ""))),
+            "years_of_experience": years_of_experience,
+            "salary": salary,
+            "department": str(employee.get("department", "")),
+            "designation": designation,
+            "phone_valid": phone_valid
+        })
+    return transformed
+
+BAD_ROWS = [
+    employee("42", salary="1500.75"),
+    employee(2, age=None),
+    employee(3, salary="nan"),
+    employee(4, years_of_experience=7.9),
+    employee(5, years_of_experience="7.9"),
+    employee(6, phone="555-0100x12", email=None),
+    employee(7, salary=None, age="x"),
+    employee(8, years_of_experience="12", phone=None, last_name=""),
+    employee("nine"),
+    employee(10, years_of_experience=[]),
+    employee(11, salary=1e20)
+]
+
+@pytest.mark.parametrize("dictionary_columns", [[], DEFAULT_DICTIONARY_COLUMNS])
+def test_columnar_transform_matches_row_loop(dictionary_columns):
+    stats = RunStats()
+    table = transform_employee_batch(BAD_ROWS, employee_schema(dictionary_columns), stats=stats)
+    assert table.to_pylist() == row_loop_transform(BAD_ROWS)
+    assert [row["employee_id"] for row in table.to_pylist()] == [42, 4, 6, 8]
+    
+    # Skipped rows are counted under the first field that failed, in field mapping order
+    assert stats.skip_reasons == {"invalid_employee_id": 1, "invalid_age": 2, "invalid_years_of_experience": 2,
+                                  "invalid_salary": 2}
+
+def test_columnar_transform_skips_list_values():
+    # Equal-length lists in every row would otherwise make a 2-D array
+    stats = RunStats()
+    batch = [employee(1, age=[1]), employee(2, age=[2]), employee(3, years_of_experience=[])]
+    table = transform_employee_batch(batch, employee_schema(DEFAULT_DICTIONARY_COLUMNS), stats=stats)
+    assert table.num_rows == 0
+    assert stats.skip_reasons == {"invalid_age": 2, "invalid_years_of_experience": 1}
+    
+    table = transform_employee_batch([employee(1, age=[1]), employee(2, age=[2])],
+                                     employee_schema(DEFAULT_DICTIONARY_COLUMNS))
+    assert table.num_rows == 0
+
+def test_columnar_transform_of_an_empty_batch():
+    assert transform_employee_batch([], employee_schema(DEFAULT_DICTIONARY_COLUMNS)).num_rows == 0
+
+def test_delta_output_between_runs(tmp_path):
+    scraper_config = {"delta": True, "fingerprint_index_path": str(tmp_path / "fingerprints.bin")}
+    output_file = str(tmp_path / "parquet_100_1.parquet")
+    metadata = transform_records_and_save_to_parquet([employee(1), employee(2), employee(3)], output_file,
+                                                     scraper_config)
+    assert metadata["delta"]["insert"] == 3
+
+    output_file = str(tmp_path / "parquet_100_2.parquet")
+    metadata = transform_records_and_save_to_parquet([employee(1), employee(2, salary=250), employee(4)],
+                                                     output_file, scraper_config)
+    changes = pq.read_table(output_file, columns=["employee_id", "change_type"]).to_pydict()
+    assert dict(zip(changes["employee_id"], changes["change_type"])) == {2: "update", 4: "insert", 3: "delete"}
+    assert metadata["delta"]["unchanged"] == 1
+
+@pytest.mark.parametrize("records", [[], [employee(1), employee(2), employee(1), employee(2)]])
+def test_delta_run_with_an_empty_batch(tmp_path, records):
+    # An empty input, or a batch whose every row the dedup stage drops, still makes a delta file
+    scraper_config = {"delta": True, "fingerprint_index_path": str(tmp_path / "fingerprints.bin"),
+                      "dedup": True, "dedup_index_path": str(tmp_path / "dedup.sqlite"), "row_group_size": 2}
+    transform_records_and_save_to_parquet([employee(1), employee(2)], str(tmp_path / "parquet_100_1.parquet"),
+                                          scraper_config)
+    output_file = str(tmp_path / "parquet_100_2.parquet")
+    metadata = transform_records_and_save_to_parquet(iter(records), output_file, scraper_config)
+    changes = pq.read_table(output_file, columns=["employee_id", "change_type"]).to_pydict()
+    if records:
+        assert changes == {"employee_id": [], "change_type": []}
+        assert metadata["delta"]["unchanged"] == 2
+    else:
+        assert dict(zip(changes["employee_id"], changes["change_type"])) == {1: "delete", 2: "delete"}
+
+@pytest.mark.parametrize("option", [{"delta": True}, {"dedup": True}, {"sink": "sqlite"},
+                                    {"output_format": "arrow"}, {"partition_cols": ["department"]}])
+def test_sharded_workers_reject_options(tmp_path, option):
+    output_dir = tmp_path / "parquet_100_1.parquet"
+    with pytest.raises(ValueError):
+        transform_records_and_save_to_parquet([employee(1), employee(2)], str(output_dir), dict(option, workers=2))
+    assert not output_dir.exists()
+
+def test_dictionary_and_plain_encodings(tmp_path):
+    output_file = str(tmp_path / "parquet_100_1.parquet")
+    metadata = transform_records_and_save_to_parquet([employee(n) for n in range(1, 11)], output_file)
+    assert metadata["compression"] == "SNAPPY"
+    assert metadata["dictionary_columns"] == ["gender", "job_title", "department", "designation"]
+    for column in ("employee_id", "full_name", "email"):
+        assert "RLE_DICTIONARY" not in metadata["encodings"][column]
+    for column in ("department", "designation", "phone", "salary"):
+        assert "RLE_DICTIONARY" in metadata["encodings"][column]
+    
+    # Dictionary columns come back as dictionary arrays
+    schema = pq.read_schema(output_file)
+    assert str(schema.field("department").type).startswith("dictionary")
+    assert schema.field("email").type == "string"
+
+def test_configured_codec_and_columns(tmp_path):
+    output_file = str(tmp_path / "parquet_100_1.parquet")
+    metadata = transform_records_and_save_to_parquet(
+        [employee(n) for n in range(1, 11)], output_file,
+        {"compression": "zstd", "dictionary_columns": ["department"], "plain_columns": ["phone"]})
+    assert metadata["compression"] == "ZSTD"
+    assert pq.read_metadata(output_file).row_group(0).column(0).compression == "ZSTD"
+    assert metadata["dictionary_columns"] == ["department"]
+    assert "RLE_DICTIONARY" not in metadata["encodings"]["phone"]
+    assert "RLE_DICTIONARY" in metadata["encodings"]["email"]
+
+@pytest.mark.parametrize("records, row_group_size, row_groups", [(10, 4, 3), (8, 4, 2), (3, 100, 1), (0, 4, 0)])
+def test_row_groups_follow_row_group_size(tmp_path, records, row_group_size, row_groups):
+    output_file = str(tmp_path / "parquet_100_1.parquet")
+    metadata = transform_records_and_save_to_parquet([employee(n) for n in range(1, records + 1)], output_file,
+                                                     {"row_group_size": row_group_size})
+    parquet_metadata = pq.read_metadata(output_file)
+    assert metadata["row_groups"] == parquet_metadata.num_row_groups == row_groups
+    assert metadata["record_count"] == parquet_metadata.num_rows == records
+    assert all(parquet_metadata.row_group(index).num_rows <= row_group_size for index in range(row_groups))
+
+def test_sharded_output_matches_single_file(tmp_path, monkeypatch):
+    # Forkserver workers import process.parquet_processor by name, which only resolves once process/
+    # is deployed into the package, so the workers are forked even if earlier tests left threads
+    monkeypatch.setattr(threading, "active_count", lambda: 1)
+    records = [employee(n, salary=100 * n, years_of_experience=n) for n in range(1, 11)]
+    single_file = str(tmp_path / "parquet_100_1.parquet")
+    single = transform_records_and_save_to_parquet(records, single_file, {"row_group_size": 2})
+    output_dir = str(tmp_path / "parquet_100_2.parquet")
+    sharded = transform_records_and_save_to_parquet(records, output_dir, {"row_group_size": 2, "workers": 2,
+                                                                          "shard_size": 3})
+    
+    # Parts are written in shard order, so the dataset reads back in input order
+    assert pq.read_table(output_dir).to_pylist() == pq.read_table(single_file).to_pylist()
+    assert sorted(os.listdir(output_dir)) == [f"part-{index:05d}.parquet" for index in range(4)]
+    
+    # Merged metadata has the shape of a single-file run plus the parts
+    assert sharded["workers"] == 2
+    assert sharded["output_file"] == output_dir
+    assert [part["record_count"] for part in sharded["parts"]] == [3, 3, 3, 1]
+    assert sharded["record_count"] == single["record_count"] == 10
+    assert sharded["row_groups"] == 2 + 2 + 2 + 1
+    assert sharded["file_size_bytes"] == sum(part["file_size_bytes"] for part in sharded["parts"])
+    for key in ("columns", "compression", "row_group_size", "dictionary_columns", "encodings"):
+        assert sharded[key] == single[key]
+
+def test_partitioned_dataset_layout(tmp_path):
+    records = [employee(n, department="IT" if n % 3 else "HR", years_of_experience=n) for n in range(10, 0, -1)]
+    output_dir = str(tmp_path / "parquet_100_1.parquet")
+    metadata = transform_records_and_save_to_parquet(records, output_dir,
+                                                     {"partition_cols": ["department", "run_date"], "row_group_size": 16})
+    run_date = metadata["processed_at"][:10]
+    assert metadata["partitioning"] == {"flavor": "hive", "columns": ["department", "run_date"]}
+    assert [(partition["path"], partition["row_count"]) for partition in metadata["partitions"]] == [
+        (f"department=HR/run_date={run_date}", 3), (f"department=IT/run_date={run_date}", 7)]
+    assert "department" not in metadata["columns"]
+    assert metadata["record_count"] == 10
+    
+    # Each partition holds its own rows, and one batch of input comes out sorted by employee_id
+    for partition in metadata["partitions"]:
+        partition_dir = os.path.join(output_dir, partition["path"])
+        assert partition["files"] == len(os.listdir(partition_dir)) == 1
+        parquet_file = pq.ParquetFile(os.path.join(partition_dir, os.listdir(partition_dir)[0]))
+        employee_ids = parquet_file.read(columns=["employee_id"])["employee_id"].to_pylist()
+        assert employee_ids == sorted(employee_ids)
+        assert len(employee_ids) == partition["row_count"]
+        statistics = parquet_file.metadata.row_group(0).column(0).statistics
+        assert (statistics.min, statistics.max) == (employee_ids[0], employee_ids[-1])
+    
+    # Readers see the partition columns again and can prune on them
+    hr = pq.read_table(output_dir, filters=[("department", "=", "HR")])
+    assert sorted(hr["employee_id"].to_pylist()) == [3, 6, 9]
+
+def test_partitioned_dataset_rerun_drops_stale_partitions(tmp_path):
+    output_dir = str(tmp_path / "parquet_100_1.parquet")
+    config = {"partition_cols": ["department"]}
+    transform_records_and_save_to_parquet([employee(1, department="HR"), employee(2, department="IT")], output_dir, config)
+    metadata = transform_records_and_save_to_parquet([employee(3, department="IT")], output_dir, config)
+    assert [partition["path"] for partition in metadata["partitions"]] == ["department=IT"]
+    assert sorted(os.listdir(output_dir)) == ["department=IT"]
+    assert pq.read_table(output_dir)["employee_id"].to_pylist() == [3]
+
+def test_unknown_partition_column(tmp_path):
+    with pytest.raises(ValueError):
+        transform_records_and_save_to_parquet([employee(1)], str(tmp_path / "parquet_100_1.parquet"),
+                                              {"partition_cols": ["region"]})
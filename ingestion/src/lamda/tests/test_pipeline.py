@@ -0,0 +1,40 @@
+import os
+import sys
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.pipeline import iter_batches, iter_pipelined
+
+def test_iter_batches_from_list_and_iterator():
+    records = list(range(7))
+    assert list(iter_batches(records, 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(iter_batches(iter(records), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(iter_batches(iter(range(6)), 3)) == [[0, 1, 2], [3, 4, 5]]
+    assert list(iter_batches([], 3)) == [[]]
+
+def test_pipelined_results_keep_batch_order():
+    batches = iter_batches(iter(range(1000)), 10)
+    results = list(iter_pipelined(batches, lambda batch: [value * 2 for value in batch], queue_size=2))
+    assert [value for batch in results for value in batch] == [value * 2 for value in range(1000)]
+
+def test_pipelined_propagates_stage_errors():
+    def failing_reader():
+        yield [1]
+        raise ValueError("upstream closed the connection")
+    
+    with pytest.raises(ValueError, match="upstream closed"):
+        list(iter_pipelined(failing_reader(), lambda batch: batch))
+    
+    def failing_transform(batch):
+        raise TypeError("bad batch")
+    
+    with pytest.raises(TypeError, match="bad batch"):
+        list(iter_pipelined(iter_batches(list(range(10)), 2), failing_transform))
+
+def test_pipelined_stops_when_writer_gives_up():
+    # Abandoning the generator early must not leave the stage threads blocked on full queues
+    results = iter_pipelined(iter_batches(iter(range(10000)), 1), lambda batch: batch, queue_size=1)
+    assert next(results) == [0]
+    results.close()
@@ -0,0 +1,57 @@
+import os
+import pstats
+import subprocess
+import sys
+import threading
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.profiling import profile_paths, run_profiled
+
+PROFILER_MODULES = ["cProfile", "pstats", "tracemalloc", "lamda.process.profiling"]
+
+def build_records(count):
+    return [{"employee_id": employee_id, "full_name": f"Ada {employee_id}"} for employee_id in range(count)]
+
+def fake_run_scraper(scraper_config, run_scraper_id, context=None):
+    # Part of the work happens on a second thread, like the pipeline stages
+    held = {}
+    worker = threading.Thread(target=lambda: held.setdefault("records", build_records(50000)))
+    worker.start()
+    worker.join()
+    return {"statusCode": 200, "body": "ok", "metadata": {"record_count": len(held["records"])}}
+
+def test_profiled_run_writes_artifacts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = run_profiled(fake_run_scraper, {"scraper_name": "json_100"}, "1", top_n=5)
+    assert result["metadata"]["record_count"] == 50000
+    profile = result["metadata"]["profile"]
+    assert (profile["profile_file"], profile["allocations_file"]) == profile_paths({"scraper_name": "json_100"}, "1")
+    assert profile["profiled_threads"] == 2
+    assert profile["peak_traced_bytes"] > 0
+    assert len(profile["hottest_functions"]) == 5
+
+    # Work done on the second thread shows up in the merged profile
+    functions = pstats.Stats(str(tmp_path / "json_100_1.prof")).stats
+    assert any(name == "build_records" for _, _, name in functions)
+    with open(tmp_path / "json_100_1.allocations.txt") as report:
+        assert report.readline().startswith("Peak traced memory:")
+
+def test_failed_run_still_writes_artifacts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def failing_run_scraper(scraper_config, run_scraper_id, context=None):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        run_profiled(failing_run_scraper, {"scraper_name": "json_100"}, "2")
+    assert (tmp_path / "json_100_2.prof").exists()
+    assert (tmp_path / "json_100_2.allocations.txt").exists()
+
+def test_handler_does_not_load_the_profiler():
+    src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    check = f"import sys, main; print(','.join(m for m in {PROFILER_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=src_dir, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.json_processor import process_employee_data
+from process.retry import RetryPolicy, invocation_deadline, retry_after_seconds
+
+BODY = json.dumps({"data": [{"id": 1, "first_name": "Test", "last_name": "User"}]}).encode()
+
+def make_response(status_code, body=b"", headers=None):
+    mock_response = MagicMock()
+    mock_response.status_code = status_code
+    mock_response.content = body
+    mock_response.json.side_effect = lambda: json.loads(body)
+    mock_response.headers = headers or {}
+    return mock_response
+
+@pytest.fixture
+def scraper_config():
+    return {"scraper_name": "json_100", "retry_attempts": 3, "retry_jitter": False, "retry_backoff_base": 0.5}
+
+def test_backoff_grows_exponentially_up_to_the_cap():
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=5.0, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+    jittered = RetryPolicy(backoff_base=1.0, backoff_max=5.0)
+    assert all(0 <= jittered.backoff(3) <= 4.0 for _ in range(50))
+
+def test_retry_after_header_formats():
+    assert retry_after_seconds(make_response(429, headers={"Retry-After": "7"})) == 7.0
+    assert retry_after_seconds(make_response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after_seconds(make_response(429, headers={"Retry-After": "soon"})) is None
+
+def test_retry_after_is_honoured_on_429(scraper_config):
+    responses = [make_response(429, headers={"Retry-After": "3"}), make_response(200, BODY)]
+    with patch('requests.Session.get', side_effect=responses), patch('time.sleep') as mock_sleep:
+        result = process_employee_data(scraper_config)
+    assert len(result["data"]) == 1
+    mock_sleep.assert_called_once_with(3.0)
+
+def test_server_errors_back_off_exponentially(scraper_config):
+    responses = [make_response(500), make_response(502), make_response(503)]
+    with patch('requests.Session.get', side_effect=responses), patch('time.sleep') as mock_sleep:
+        with pytest.raises(Exception, match="after 3 attempts"):
+            process_employee_data(scraper_config)
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 1.0]
+
+def test_client_errors_are_not_retried(scraper_config):
+    with patch('requests.Session.get', return_value=make_response(404)) as mock_get, patch('time.sleep') as mock_sleep:
+        with pytest.raises(Exception, match="non-retryable status code 404"):
+            process_employee_data(scraper_config)
+    assert mock_get.call_count == 1
+    mock_sleep.assert_not_called()
+
+def test_deadline_fails_fast_instead_of_sleeping(scraper_config):
+    deadline = time.monotonic() + 1.0
+    responses = [make_response(503, headers={"Retry-After": "10"})]
+    with patch('requests.Session.get', side_effect=responses) as mock_get, patch('time.sleep') as mock_sleep:
+        with pytest.raises(Exception, match="deadline"):
+            process_employee_data(dict(scraper_config, retry_backoff_max=60), deadline=deadline)
+    assert mock_get.call_args.kwargs["timeout"] <= 1.0
+    mock_sleep.assert_not_called()
+
+def test_invocation_deadline_from_lambda_context():
+    context = MagicMock()
+    context.get_remaining_time_in_millis.return_value = 60000
+    deadline = invocation_deadline(context, {"deadline_margin": 10})
+    assert 49 < deadline - time.monotonic() <= 50
+    assert invocation_deadline("", {}) is None
@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.scheduler import Scheduler, frequency_seconds, new_run_scraper_id
+
+def write_config(path, scrapers):
+    with open(path, 'w') as config_file:
+        json.dump(scrapers, config_file)
+
+def test_frequency_seconds():
+    assert frequency_seconds("daily") == 86400
+    assert frequency_seconds(90) == 90
+    with pytest.raises(ValueError):
+        frequency_seconds("fortnightly")
+    
+    # Run ids are per second, so faster schedules would reuse an output name
+    assert frequency_seconds(1) == 1
+    for frequency in (0.5, 0, -60):
+        with pytest.raises(ValueError):
+            frequency_seconds(frequency)
+    assert new_run_scraper_id(datetime(2024, 5, 1, 6, 30, 5)) == "20240501063005"
+
+def test_scheduler_runs_due_scrapers_and_skips_overlapping_runs(tmp_path):
+    path = str(tmp_path / "run_scraper.json")
+    write_config(path, [
+        {"scraper_name": "json_100", "frequency": "hourly"},
+        {"scraper_name": "json_200", "frequency": 60, "enabled": False},
+        {"scraper_name": "json_300"},
+        {"scraper_name": "json_400", "frequency": "sometimes"}
+    ])
+    release = threading.Event()
+    calls = []
+    
+    def run_scraper(scraper_config, run_scraper_id):
+        calls.append((scraper_config["scraper_name"], run_scraper_id))
+        release.wait(5)
+        return {"statusCode": 200, "body": "ok"}
+    
+    scheduler = Scheduler(run_scraper, path, max_workers=2, clock=lambda: 0.0)
+    try:
+        # Only enabled scrapers with a valid frequency are scheduled, and they run at once
+        assert scheduler.tick(now=0.0) == ["json_100"]
+        assert scheduler.tick(now=1800.0) == []
+        
+        # Due again while the first run is still going
+        assert scheduler.tick(now=3600.0) == []
+        assert scheduler.skipped_runs == {"json_100": 1}
+        
+        release.set()
+        scheduler.running["json_100"].result(timeout=5)
+        # A late tick keeps the fixed hourly grid instead of drifting
+        assert scheduler.tick(now=7300.0) == ["json_100"]
+        assert scheduler.next_run["json_100"] == 10800.0
+        scheduler.running["json_100"].result(timeout=5)
+    finally:
+        scheduler.executor.shutdown(wait=True)
+    assert [scraper_name for scraper_name, _ in calls] == ["json_100", "json_100"]
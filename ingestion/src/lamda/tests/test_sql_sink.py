@@ -0,0 +1,79 @@
+import json
+import os
+import sqlite3
+import sys
+import pytest
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.json_writer import write_json_output
+from process.records import EmployeeRecord
+from process.sql_sink import SqliteSink, sink_settings
+
+def record(employee_id, department="IT", designation="lead", salary=100):
+    return EmployeeRecord(employee_id, f"Ada {employee_id}", f"{employee_id}@x.com", "555-0100", "female", 30,
+                          "Engineer", 12, salary, department, designation)
+
+def query(path, sql):
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute(sql).fetchall()
+    connection.close()
+    return rows
+
+@pytest.fixture
+def sink_path(tmp_path):
+    return str(tmp_path / "warehouse.sqlite")
+
+def test_sink_settings():
+    assert sink_settings({}) is None
+    assert sink_settings({"sink": "sqlite"}) == ("warehouse.sqlite", "employees")
+    with pytest.raises(ValueError):
+        sink_settings({"sink": "duckdb"})
+    with pytest.raises(ValueError):
+        sink_settings({"sink": "sqlite", "sink_table": "employees; DROP TABLE runs"})
+
+def test_upserts_and_aggregates(sink_path):
+    sink = SqliteSink(sink_path)
+    sink.write_records([record(1), record(2, salary=300)])
+    # A repeated id within and across batches replaces the earlier row
+    sink.write_records([record(2, "HR", salary=50), record(3, "HR", salary=70), record(3, "HR", salary=90)])
+    summary = sink.close()
+    assert summary["row_count"] == 3
+    assert query(sink_path, "SELECT employee_id, department, salary FROM employees ORDER BY 1") == \
+        [(1, "IT", 100), (2, "HR", 50), (3, "HR", 90)]
+    assert query(sink_path, "SELECT department, designation, employee_count, avg_salary "
+                            "FROM employees_aggregates ORDER BY 1") == \
+        [("HR", "lead", 2, 70.0), ("IT", "lead", 1, 100.0)]
+    assert query(sink_path, "SELECT designation, employee_count FROM employees_by_designation") == [("lead", 3)]
+    assert ("employees_department",) in query(sink_path, "SELECT name FROM sqlite_master WHERE type = 'index'")
+
+    # A later run updates rows in place; an aborted one leaves nothing behind
+    sink = SqliteSink(sink_path)
+    sink.write_records([record(1, "HR", salary=30)])
+    sink.close()
+    sink = SqliteSink(sink_path)
+    sink.write_records([record(4)])
+    sink.abort()
+    assert query(sink_path, "SELECT department, employee_count, avg_salary FROM employees_by_department") == \
+        [("HR", 3, 170 / 3)]
+
+def test_delta_rows_delete_from_the_sink(sink_path):
+    sink = SqliteSink(sink_path)
+    sink.write_records([record(1), record(2, "HR")])
+    sink.close()
+    sink = SqliteSink(sink_path, delta=True)
+    sink.write_records([record(3).with_change_type("insert"), {"employee_id": 2, "change_type": "delete"}])
+    assert sink.close()["deleted"] == 1
+    assert query(sink_path, "SELECT employee_id FROM employees ORDER BY 1") == [(1,), (3,)]
+    assert query(sink_path, "SELECT department, employee_count FROM employees_aggregates") == [("IT", 2)]
+
+def test_json_output_is_loaded_into_the_sink(tmp_path, sink_path):
+    output_file = str(tmp_path / "json_100_1.json")
+    metadata = {}
+    write_json_output(output_file, [record(1), record(2)], metadata,
+                      {"sink": "sqlite", "sink_path": sink_path, "batch_size": 1})
+    with open(output_file) as f:
+        assert json.load(f)["metadata"]["sink"]["row_count"] == 2
+    assert metadata["sink"]["upserted"] == 2
+    assert query(sink_path, "SELECT COUNT(*) FROM employees") == [(2,)]
@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+
+# Add the parent directory to sys.path to import modules properly
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from process.config_cache import get_scraper_config, load_scraper_configs
+from process.http_session import get_session
+from process.lazy_import import LazyModule
+
+# Cold import of the JSON handler, measured with -X importtime. requests dominates at roughly
+# 0.1s; heavy libraries must not be imported until a transform needs them.
+IMPORT_BUDGET_SECONDS = 0.5
+HEAVY_MODULES = ["pandas", "pyarrow", "numpy"]
+
+def write_config(path, scrapers):
+    with open(path, 'w') as config_file:
+        json.dump(scrapers, config_file)
+
+def test_config_cache_reloads_only_when_file_changes(tmp_path):
+    path = str(tmp_path / "run_scraper.json")
+    write_config(path, [{"scraper_name": "json_100", "timeout": 30}, {"scraper_name": "json_100", "timeout": 5}])
+    first = load_scraper_configs(path)
+    assert load_scraper_configs(path) is first
+    assert get_scraper_config("json_100", path)["timeout"] == 30
+    assert get_scraper_config("missing", path) is None
+    
+    write_config(path, [{"scraper_name": "json_100", "timeout": 60}])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert get_scraper_config("json_100", path)["timeout"] == 60
+
+def test_config_copies_do_not_change_the_cache(tmp_path):
+    path = str(tmp_path / "run_scraper.json")
+    write_config(path, [{"scraper_name": "json_100", "timeout": 30}])
+    get_scraper_config("json_100", path)["timeout"] = 1
+    assert get_scraper_config("json_100", path)["timeout"] == 30
+
+def test_session_is_reused():
+    assert get_session() is get_session()
+
+def test_lazy_module_imports_on_first_use():
+    module = LazyModule("json")
+    assert module._module is None
+    assert module.dumps([1]) == "[1]"
+    assert module._module is json
+
+def test_handler_import_time_budget():
+    src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    check = f"import sys, main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", check], cwd=src_dir,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+    # The last "| main" line holds the cumulative import time in microseconds
+    main_line = [line for line in result.stderr.splitlines() if line.rstrip().endswith("| main")][-1]
+    cumulative_seconds = int(main_line.split("|")[1]) / 1_000_000
+    assert cumulative_seconds < IMPORT_BUDGET_SECONDS
@@ -1,6 +1,19 @@
-import json
 import os
+import sys
+from lamda.process.batch import DEFAULT_MAX_PER_HOST, DEFAULT_MAX_WORKERS, batch_response, run_batch, select_scrapers
+from lamda.process.config_cache import get_scraper_config as load_scraper_config, list_scraper_configs
+from lamda.process.dedup import commit_dedup_index, dedup_settings
+from lamda.process.delta import commit_fingerprint_index, fingerprint_index_path
+from lamda.process.http_cache import save_validators, validator_cache_path
+from lamda.process.instrumentation import RunStats, log_stats
+from lamda.process.lazy_import import LazyModule
+from lamda.process.retry import invocation_deadline
+from lamda.process.scheduler import run_scheduler
 from lamda.process.json_processor import process_employee_data
+from lamda.process.json_writer import output_extension, write_json_output
+
+# Loaded only by invocations that ask for a profile
+profiling = LazyModule("lamda.process.profiling")
 
 def lambdaHandler(event, context):
    
@@ -24,45 +37,114 @@ def lambdaHandler(event, context):
                 "body": f"Scraper configuration not found for: {scraper_name}"
             }
         
-        # Process the employee data
-        output_data = process_employee_data(scraper_config)
+        # Profiling is opt-in per invocation; without the flag the profiler is never even imported
+        if scraper_input.get("profile", False):
+            return profiling.run_profiled(run_scraper, scraper_config, run_scraper_id, context,
+                                          scraper_input.get("profile_top_n", profiling.DEFAULT_TOP_N))
         
-        # Save the processed data to a local file when running locally
-        output_filename = f"{scraper_name}_{run_scraper_id}.json"
-        with open(output_filename, 'w') as output_file:
-            json.dump(output_data, output_file, indent=2)
+        return run_scraper(scraper_config, run_scraper_id, context)
         
+    except Exception as e:
+        print(f"Error in lambdaHandler: {str(e)}")
+        return {
+            "statusCode": 500,
+            "body": f"Error processing request: {str(e)}"
+        }
+
+def run_scraper(scraper_config, run_scraper_id, context=None):
+    
+    # Process the employee data; in pipeline mode it is written to output_filename as it streams in
+    output_filename = f"{scraper_config['scraper_name']}_{run_scraper_id}{output_extension(scraper_config)}"
+    stats = RunStats()
+    # Retries give up early rather than run into the Lambda timeout
+    deadline = invocation_deadline(context, scraper_config)
+    output_data = process_employee_data(scraper_config, output_filename, stats, deadline)
+    metadata = output_data["metadata"]
+    
+    # Upstream data is unchanged since the last run, so its output file is still current
+    if metadata.get("cache_hit"):
+        metadata["stats"] = stats.as_dict()
+        log_stats(scraper_config, metadata["stats"], run_scraper_id=run_scraper_id, cache_hit=True)
         return {
             "statusCode": 200,
-            "body": f"Successfully processed employee data. Output saved to {output_filename}"
+            "body": f"Upstream data unchanged. Reusing output {metadata['output_file']}",
+            "cache_hit": True,
+            "metadata": metadata
         }
-        
+    validators = metadata.pop("validators", None)
+    
+    # Save the processed data to a local file when running locally, streamed in batches
+    if output_data["data"] is not None:
+        with stats.stage("write"):
+            record_count = write_json_output(output_filename, output_data["data"], metadata, scraper_config)
+        stats.add_bytes("write", os.path.getsize(output_filename))
+        stats.count("records_written", record_count)
+    
+    # Remember the validators, delta and dedup indexes only after the output has been written successfully
+    index_path = fingerprint_index_path(scraper_config)
+    if index_path:
+        commit_fingerprint_index(index_path)
+    dedup = dedup_settings(scraper_config)
+    if dedup:
+        commit_dedup_index(dedup[0], output_filename)
+    save_validators(validator_cache_path(scraper_config), scraper_config, metadata["source"], validators,
+                    output_filename, metadata["record_count"])
+    
+    metadata["stats"] = stats.as_dict()
+    log_stats(scraper_config, metadata["stats"], run_scraper_id=run_scraper_id, cache_hit=False)
+    return {
+        "statusCode": 200,
+        "body": f"Successfully processed employee data. Output saved to {output_filename}",
+        "cache_hit": False,
+        "metadata": metadata
+    }
+
+def batchHandler(event, context):
+    
+    # Run several scrapers in one invocation: every enabled scraper, or the ones named in
+    # scraper_names, all under the same run_scraper_id
+    scraper_input = event.get("scraper_input", {})
+    run_scraper_id = scraper_input.get("run_scraper_id")
+    if not run_scraper_id:
+        return {
+            "statusCode": 400,
+            "body": "Missing required parameter: run_scraper_id"
+        }
+    
+    try:
+        scraper_configs, skipped = select_scrapers(list_scraper_configs(), scraper_input.get("scraper_names"))
     except Exception as e:
-        print(f"Error in lambdaHandler: {str(e)}")
+        print(f"Error loading scraper configuration: {str(e)}")
         return {
             "statusCode": 500,
-            "body": f"Error processing request: {str(e)}"
+            "body": f"Error loading scraper configuration: {str(e)}"
         }
+    
+    results, elapsed_seconds = run_batch(
+        scraper_configs,
+        lambda scraper_config: run_scraper(scraper_config, run_scraper_id, context),
+        scraper_input.get("max_workers", DEFAULT_MAX_WORKERS),
+        scraper_input.get("max_per_host", DEFAULT_MAX_PER_HOST)
+    )
+    return batch_response(results, skipped, elapsed_seconds)
 
 def get_scraper_config(scraper_name):
     
     try:
-        # Load the scraper configuration from run_scraper.json
-        with open('run_scraper.json', 'r') as config_file:
-            scrapers = json.load(config_file)
-        
-        # Find the matching scraper configuration
-        for scraper in scrapers:
-            if scraper.get("scraper_name") == scraper_name:
-                return scraper
-        
-        return None
+        # Look up the scraper in run_scraper.json; the parsed file is cached across warm
+        # invocations and only re-read when it changes
+        return load_scraper_config(scraper_name)
     
     except Exception as e:
         print(f"Error loading scraper configuration: {str(e)}")
         return None
 
 if __name__ == "__main__":
+    # python main.py --schedule keeps running and starts each scraper by its "frequency"
+    if "--schedule" in sys.argv:
+        run_scheduler(run_scraper)
+        sys.exit(0)
+    
     # For local testing, create a test input
     inputData = {
         "scraper_input": {
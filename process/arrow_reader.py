@@ -0,0 +1,51 @@
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Comparison operators accepted in filters, as (column, operator, value) tuples
+FILTER_OPERATORS = {
+    "==": pc.equal,
+    "!=": pc.not_equal,
+    "<": pc.less,
+    "<=": pc.less_equal,
+    ">": pc.greater,
+    ">=": pc.greater_equal,
+    "in": lambda column, values: pc.is_in(column, value_set=pa.array(values)),
+    "not in": lambda column, values: pc.invert(pc.is_in(column, value_set=pa.array(values)))
+}
+
+# Memory-mapped output files kept across calls: path -> ((inode, mtime_ns, size), table)
+_mapped_tables = {}
+
+def open_arrow_output(path):
+    
+    # The whole file as a Table whose buffers point into a read-only memory map. Nothing is
+    # read or copied up front; pages are loaded as columns are touched. The writer replaces
+    # the file instead of rewriting it, so tables from the old mapping stay valid and the new
+    # file is mapped on the next call.
+    stat = os.stat(path)
+    version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    cached = _mapped_tables.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    _mapped_tables[path] = (version, table)
+    return table
+
+def read_arrow_output(path, columns=None, filters=None):
+    
+    # Project and filter an Arrow output file written by the parquet processor. Every filter
+    # must hold, as with pyarrow.parquet.read_table. Projected columns are views into the
+    # memory map; only filtering copies, and then only the selected rows of those columns.
+    table = open_arrow_output(path)
+    mask = None
+    for column, operator, value in filters or ():
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        condition = FILTER_OPERATORS[operator](table[column], value)
+        mask = condition if mask is None else pc.and_kleene(mask, condition)
+    if columns is not None:
+        table = table.select(columns)
+    return table.filter(mask) if mask is not None else table
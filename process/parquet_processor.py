@@ -1,46 +1,175 @@
+import glob
+import hashlib
+import multiprocessing
 import requests
-import time
-import pandas as pd
 from datetime import datetime
 import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from .dedup import MISSING_EMPLOYEE_ID, VALIDATION_CHECKS, commit_dedup_index, open_dedup_index
+from .delta import DELETE, DeltaTracker, commit_fingerprint_index, fingerprint_index_path, fingerprint_text
+from .fetch import fetch, transfer_metadata
+from .field_mapping import FieldPlan, find_employee_records, resolve_field_mapping
+from .file_source import FILE_SOURCE, iter_source_records, source_path, source_type
+from .http_cache import (cache_hit_metadata, conditional_headers, content_hash, hashing_chunks,
+                         load_validators, response_validators, save_validators, validator_cache_path)
+from .instrumentation import RunStats
+from .json_stream import DEFAULT_CHUNK_SIZE, iter_employee_records
+from .lazy_import import LazyModule
+from .pipeline import DEFAULT_QUEUE_SIZE, iter_batches, iter_pipelined
+from .retry import RetryPolicy
+from .sql_sink import open_sink
 
-def process_employee_data(scraper_config, output_file):
+# numpy and pyarrow (which pulls in pandas) are imported on first use, so a handler call
+# that ends early, e.g. on unchanged upstream data, does not pay for them
+np = LazyModule("numpy")
+pa = LazyModule("pyarrow")
+pc = LazyModule("pyarrow.compute")
+ds = LazyModule("pyarrow.dataset")
+pq = LazyModule("pyarrow.parquet")
+
+# Parquet writer defaults; each can be overridden per scraper in run_scraper.json
+DEFAULT_COMPRESSION = "snappy"
+DEFAULT_ROW_GROUP_SIZE = 131072
+DEFAULT_DICTIONARY_COLUMNS = ["department", "gender", "designation", "job_title"]
+# Unique-per-row columns gain nothing from Parquet dictionary pages, so they are written plain
+DEFAULT_PLAIN_COLUMNS = ["employee_id", "full_name", "email"]
+
+# File extension for each value of the "output_format" config key. arrow and feather both
+# write an Arrow IPC (Feather v2) file, which arrow_reader.py reads back from a memory map.
+OUTPUT_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "feather": ".feather"}
+
+# Raw records shared with forked shard workers, so shards are not pickled to each process
+_shard_source = None
+
+# 2**63 as a float; floats in [-2**63, 2**63) are the ones that fit an int64 column
+INT64_LIMIT = float(2 ** 63)
+
+DESIGNATION_LABELS = ["system engineer", "data engineer", "senior data engineer", "lead"]
+
+# Output columns and their Arrow type names, in file order
+EMPLOYEE_COLUMNS = [
+    ("employee_id", "int32"),
+    ("full_name", "string"),
+    ("email", "string"),
+    ("phone", "string"),
+    ("gender", "string"),
+    ("age", "int32"),
+    ("job_title", "string"),
+    ("years_of_experience", "int32"),
+    ("salary", "int32"),
+    ("department", "string"),
+    ("designation", "string"),
+    ("phone_valid", "bool")
+]
+
+def process_employee_data(scraper_config, output_file, stats=None, deadline=None):
    
     # Get the API URL from the scraper config or use the default
     api_url = scraper_config.get("api_url", "https://api.slingacademy.com/v1/sample-data/files/employees.json")
     
-    # Maximum number of retry attempts
-    max_retries = scraper_config.get("retry_attempts", 3)
+    # Backoff, retryable statuses and the maximum number of attempts come from the scraper config;
+    # deadline is the monotonic time by which the invocation has to finish
+    retry_policy = RetryPolicy.from_config(scraper_config, deadline)
+    max_retries = retry_policy.attempts
     retry_count = 0
     
+    # Stage timings and record counters; the handler reports them in the response metadata
+    stats = stats or RunStats()
+    
+    # A file source replays local dumps through the same transform path, without any HTTP
+    if source_type(scraper_config) == FILE_SOURCE:
+        metadata = transform_records_and_save_to_parquet(iter_source_records(scraper_config, stats), output_file,
+                                                         scraper_config, stats)
+        metadata["source"] = source_path(scraper_config)
+        metadata["source_type"] = FILE_SOURCE
+        return {
+            "metadata": metadata
+        }
+    
+    # With conditional_fetch enabled, send the validators of the last successful run
+    cache_path = validator_cache_path(scraper_config)
+    cached = load_validators(cache_path, scraper_config, api_url)
+    headers = conditional_headers(cached)
+    
     while retry_count < max_retries:
         try:
             # Make the HTTP request to the API
             print(f"Attempting to fetch data from: {api_url}")
-            response = requests.get(api_url, timeout=scraper_config.get("timeout", 30))
+            stream = scraper_config.get("stream", False)
+            fetched_bytes = stats.byte_count("fetch")
+            with stats.stage("fetch"):
+                response = fetch(api_url, scraper_config, retry_policy.request_timeout(scraper_config.get("timeout", 30)),
+                                 stream, headers)
+            
+            # Upstream has not changed since the cached run; reuse its output
+            if response.status_code == 304 and cached:
+                print("API data not modified since last run, reusing previous output")
+                return {
+                    "metadata": cache_hit_metadata(cached, api_url, "not_modified")
+                }
             
             # Check if the request was successful
             if response.status_code == 200:
-                # Parse the JSON response
-                raw_data = response.json()
-                
-                # Print the structure of the response for debugging
-                print(f"API Response structure: {list(raw_data.keys()) if isinstance(raw_data, dict) else 'Not a dictionary'}")
+                if stream:
+                    # Parse the employee array item by item instead of loading the whole body
+                    chunk_size = scraper_config.get("chunk_size", DEFAULT_CHUNK_SIZE)
+                    chunks = stats.timed_iter(response.iter_content(chunk_size=chunk_size), "fetch",
+                                              measure_bytes=True)
+                    hasher = hashlib.sha256()
+                    if cache_path:
+                        chunks = hashing_chunks(chunks, hasher)
+                    try:
+                        records = iter_employee_records(chunks)
+                        metadata = transform_records_and_save_to_parquet(records, output_file, scraper_config, stats)
+                    finally:
+                        response.close()
+                    body_hash = hasher.hexdigest()
+                else:
+                    stats.add_bytes("fetch", len(response.content))
+                    
+                    # Identical content to the cached run means the previous output is still valid
+                    body_hash = content_hash(response.content) if cache_path else None
+                    if cached and cached.get("content_hash") == body_hash:
+                        print("API data unchanged since last run, reusing previous output")
+                        return {
+                            "metadata": cache_hit_metadata(cached, api_url, "content_unchanged")
+                        }
+                    
+                    # Parse the JSON response
+                    with stats.stage("parse"):
+                        raw_data = response.json()
+                        
+                        # Print the structure of the response for debugging
+                        print(f"API Response structure: {list(raw_data.keys()) if isinstance(raw_data, dict) else 'Not a dictionary'}")
+                    
+                    # Transform the data and save to Parquet
+                    metadata = transform_and_save_to_parquet(raw_data, output_file, scraper_config, stats)
+                metadata["transfer"] = transfer_metadata(response, scraper_config, stats.byte_count("fetch") - fetched_bytes)
                 
-                # Transform the data and save to Parquet
-                metadata = transform_and_save_to_parquet(raw_data, output_file)
+                # Remember the validators only after the output has been written successfully
+                if cache_path:
+                    metadata["cache_hit"] = False
+                    save_validators(cache_path, scraper_config, api_url, response_validators(response, body_hash),
+                                    output_file, metadata["record_count"])
                 
                 return {
                     "metadata": metadata
                 }
             else:
                 print(f"Error: API returned status code {response.status_code}")
+                
+                # Client errors other than 408/425/429 will not succeed on a retry
+                if not retry_policy.is_retryable(response.status_code):
+                    raise Exception(f"API returned non-retryable status code {response.status_code}")
                 retry_count += 1
                 if retry_count >= max_retries:
                     raise Exception(f"Failed to retrieve data after {max_retries} attempts. Last status code: {response.status_code}")
                 
-                # Wait before retrying
-                time.sleep(2)
+                # Back off before retrying, honouring Retry-After on 429/503
+                retry_policy.wait(retry_count, response)
+                stats.count("retries")
                 
         except requests.exceptions.RequestException as e:
             print(f"Request error: {str(e)}")
@@ -48,123 +177,562 @@ def process_employee_data(scraper_config, output_file):
             if retry_count >= max_retries:
                 raise Exception(f"Failed to connect to API after {max_retries} attempts. Error: {str(e)}")
             
-            # Wait before retrying
-            time.sleep(2)
+            # Back off before retrying
+            retry_policy.wait(retry_count)
+            stats.count("retries")
     
     raise Exception("Failed to process employee data")
 
-def transform_and_save_to_parquet(raw_data, output_file):
+def output_format(scraper_config):
+    
+    file_format = (scraper_config or {}).get("output_format", "parquet")
+    if file_format not in OUTPUT_EXTENSIONS:
+        raise ValueError(f"Unsupported output_format: {file_format}")
+    return file_format
+
+def output_extension(scraper_config):
+    
+    return OUTPUT_EXTENSIONS[output_format(scraper_config)]
+
+def transform_and_save_to_parquet(raw_data, output_file, scraper_config=None, stats=None):
   
-    # Extract employees data - handle different possible structures
-    employees = []
-    
-    if isinstance(raw_data, dict):
-        # Try different possible keys where employee data might be
-        if "employees" in raw_data:
-            employees = raw_data["employees"]
-        elif "users" in raw_data:
-            employees = raw_data["users"]
-        elif "data" in raw_data:
-            employees = raw_data["data"]
-    elif isinstance(raw_data, list):
-        # The API might return a direct list of employees
-        employees = raw_data
-    
-    # If we still don't have employee data, try to infer from the structure
-    if not employees and isinstance(raw_data, dict):
-        # Look for any key that contains a list which might be employee data
-        for key, value in raw_data.items():
-            if isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict):
-                print(f"Found potential employee data in key: {key}")
-                employees = value
-                break
-    
-    # If we still have no employees data, raise an error with more information
-    if not employees:
-        error_msg = "Could not find employee data in the API response. "
-        if isinstance(raw_data, dict):
-            error_msg += f"Available keys: {list(raw_data.keys())}"
-        else:
-            error_msg += f"Response is not a dictionary but a {type(raw_data)}"
-        raise ValueError(error_msg)
+    employees = find_employee_records(raw_data)
+    return transform_records_and_save_to_parquet(employees, output_file, scraper_config, stats)
+
+def transform_records_and_save_to_parquet(employees, output_file, scraper_config=None, stats=None):
     
-    print(f"Found {len(employees)} employee records to process")
+    scraper_config = scraper_config or {}
+    stats = stats or RunStats()
     
-    # Transform the data
-    transformed_data = []
-    for employee in employees:
-        try:
-            # Extract required fields
-            employee_id = int(employee.get("id", 0))
-            first_name = str(employee.get("first_name", employee.get("firstName", "")))
-            last_name = str(employee.get("last_name", employee.get("lastName", "")))
-            email = str(employee.get("email", ""))
-            phone = str(employee.get("phone", employee.get("phoneNumber", "")))
-            gender = str(employee.get("gender", ""))
-            age = int(employee.get("age", 0))
-            job_title = str(employee.get("job_title", employee.get("jobTitle", "")))
-            years_of_experience = int(employee.get("years_of_experience", employee.get("experience", 0)))
-            salary = int(float(employee.get("salary", 0)))
-            department = str(employee.get("department", ""))
-            
-            # Create designation based on years of experience
-            if years_of_experience < 3:
-                designation = "system engineer"
-            elif 3 <= years_of_experience <= 5:
-                designation = "data engineer"
-            elif 5 < years_of_experience <= 10:
-                designation = "senior data engineer"
-            else:
-                designation = "lead"
-                
-            # Combine first name and last name into full name
-            full_name = f"{first_name} {last_name}".strip()
-            
-            # Check if phone number is valid
-            phone_valid = 'x' not in phone if phone else True
-            phone_value = "Invalid Number" if not phone_valid else phone
-            
-            transformed_data.append({
-                "employee_id": employee_id,
-                "full_name": full_name,
-                "email": email,
-                "phone": phone_value,
-                "gender": gender,
-                "age": age,
-                "job_title": job_title,
-                "years_of_experience": years_of_experience,
-                "salary": salary,
-                "department": department,
-                "designation": designation,
-                "phone_valid": phone_valid
-            })
-            
-        except (ValueError, TypeError) as e:
-            print(f"Error processing employee record: {str(e)}")
-            # Skip invalid records
-            continue
+    # With more than one worker the output becomes a dataset directory of part files
+    if scraper_config.get("workers", 1) > 1:
+        return transform_and_save_sharded(employees, output_file, scraper_config, stats)
+    
+    compression = scraper_config.get("compression", DEFAULT_COMPRESSION)
+    row_group_size = scraper_config.get("row_group_size", DEFAULT_ROW_GROUP_SIZE)
+    dictionary_columns = scraper_config.get("dictionary_columns", DEFAULT_DICTIONARY_COLUMNS)
+    partition_cols = scraper_config.get("partition_cols")
+    
+    # Arrow output is one file of plain columns; see write_arrow_file
+    arrow_output = output_format(scraper_config) != "parquet"
+    if arrow_output:
+        if partition_cols:
+            raise ValueError("Arrow output cannot be combined with partition_cols")
+        dictionary_columns = []
+    plain_columns = scraper_config.get("plain_columns", DEFAULT_PLAIN_COLUMNS)
+    schema = employee_schema(dictionary_columns)
+    page_dictionary_columns = [name for name in schema.names if name not in plain_columns]
     
-    # Convert to pandas DataFrame
-    df = pd.DataFrame(transformed_data)
+    # Delta mode writes only inserted/updated/deleted rows, tagged with a change_type column
+    index_path = fingerprint_index_path(scraper_config)
+    tracker = DeltaTracker(index_path) if index_path else None
+    output_schema = schema.append(pa.field("change_type", pa.dictionary(pa.int32(), pa.string()))) if tracker else schema
     
-    # Ensure data types
-    df["employee_id"] = df["employee_id"].astype("int32")
-    df["age"] = df["age"].astype("int32")
-    df["years_of_experience"] = df["years_of_experience"].astype("int32")
-    df["salary"] = df["salary"].astype("int32")
-    df["phone_valid"] = df["phone_valid"].astype("bool")
+    # Dedup mode drops (or flags) rows whose employee_id or email an earlier batch or run wrote
+    dedup = open_dedup_index(scraper_config, output_file)
+    
+    # A configured sink also loads every written table into the database, in one transaction
+    sink = open_sink(scraper_config)
     
     # Create output directory if it doesn't exist
     os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
     
-    # Save to Parquet
-    df.to_parquet(output_file, index=False)
+    def transform(batch):
+        with stats.stage("transform"):
+            table = transform_employee_batch(batch, schema, scraper_config.get("field_mapping"), stats)
+            if dedup:
+                table = dedup_table(table, dedup, stats)
+            return delta_table(table, tracker) if tracker else table
+    
+    # Transform one row group worth of records at a time and append it straight to the file,
+    # so no pandas copy and no full in-memory table is ever built. In pipeline mode reading,
+    # transforming and writing run on overlapping threads joined by bounded queues.
+    batches = stats.timed_iter(iter_batches(employees, row_group_size), "parse", exclude=("fetch",))
+    if scraper_config.get("pipeline", False):
+        tables = iter_pipelined(batches, transform, scraper_config.get("queue_size", DEFAULT_QUEUE_SIZE))
+    else:
+        tables = map(transform, batches)
+    
+    # Deleted ids are only known once every batch has been classified
+    if tracker:
+        tables = with_deleted_rows(tables, tracker, output_schema)
+    
+    # The writer pulls batches through the stages above; time spent producing them is charged
+    # to those stages rather than to the write
+    tables = stats.timed_iter(tables, "_write_input")
+    if sink:
+        tables = loaded_into_sink(tables, sink)
+    try:
+        with stats.stage("write", exclude=("_write_input",)):
+            if arrow_output:
+                written = write_arrow_file(tables, output_file, output_schema, row_group_size)
+            elif partition_cols:
+                written = write_partitioned_dataset(tables, output_file, output_schema, partition_cols, compression,
+                                                    row_group_size, page_dictionary_columns)
+            else:
+                written = write_parquet_file(tables, output_file, output_schema, compression,
+                                             row_group_size, page_dictionary_columns)
+        if sink:
+            with stats.stage("write"):
+                sink_summary = sink.close()
+    except BaseException:
+        if dedup:
+            dedup.abort()
+        if sink:
+            sink.abort()
+        raise
+    stats.add_bytes("write", written["file_size_bytes"])
+    stats.count("records_written", written["record_count"])
+    
+    # The fingerprint and dedup indexes only move forward once the output is complete
+    if tracker:
+        tracker.save_pending()
+        commit_fingerprint_index(index_path)
+    if dedup:
+        validation = dedup.summary(stats)
+        dedup.save_pending()
+        commit_dedup_index(dedup.path, output_file)
     
     # Return metadata
-    return {
+    metadata = {
         "processed_at": datetime.now().isoformat(),
-        "record_count": len(df),
-        "columns": list(df.columns),
+        "record_count": written.pop("record_count"),
+        "columns": written.pop("columns", output_schema.names),
         "output_file": output_file,
-        "file_size_bytes": os.path.getsize(output_file)
+        "file_size_bytes": written.pop("file_size_bytes"),
+        "compression": written.pop("compression", str(compression).upper()),
+        "row_group_size": row_group_size,
+        "row_groups": written.pop("row_groups"),
+        "dictionary_columns": [name for name in schema.names if pa.types.is_dictionary(schema.field(name).type)]
+    }
+    metadata.update(written)
+    if tracker:
+        metadata["output_mode"] = "delta"
+        metadata["delta"] = tracker.summary()
+    if dedup:
+        metadata["validation"] = validation
+    if sink:
+        metadata["sink"] = sink_summary
+    return metadata
+
+def with_deleted_rows(tables, tracker, schema):
+    
+    yield from tables
+    yield deleted_rows_table(tracker.deleted_ids(), schema)
+
+def loaded_into_sink(tables, sink):
+    
+    for table in tables:
+        sink.write_rows(table_rows(table, sink.columns))
+        yield table
+
+def table_rows(table, columns):
+    
+    # Row tuples for the sink. Converting whole columns through numpy is several times faster
+    # than to_pylist, and dictionary columns only convert their few distinct values.
+    values = []
+    for name in columns:
+        column = table[name].combine_chunks()
+        if pa.types.is_dictionary(column.type):
+            labels = np.array(column.dictionary.to_pylist() + [None], dtype=object)
+            values.append(labels[column.indices.fill_null(len(column.dictionary)).to_numpy()].tolist())
+        elif column.null_count:
+            values.append(column.to_pylist())
+        else:
+            values.append(column.to_numpy(zero_copy_only=False).tolist())
+    return list(zip(*values))
+
+def write_parquet_file(tables, output_file, schema, compression, row_group_size, page_dictionary_columns):
+    
+    record_count = 0
+    with pq.ParquetWriter(output_file, schema, compression=compression,
+                          use_dictionary=page_dictionary_columns or False) as writer:
+        for table in tables:
+            # Delta batches with nothing changed would otherwise each leave an empty row group
+            if not table.num_rows:
+                continue
+            writer.write_table(table, row_group_size=row_group_size)
+            record_count += table.num_rows
+    
+    # Report what actually ended up in the file rather than what was requested
+    parquet_metadata = pq.read_metadata(output_file)
+    written = {
+        "record_count": record_count,
+        "file_size_bytes": os.path.getsize(output_file),
+        "row_groups": parquet_metadata.num_row_groups,
+        "encodings": {}
+    }
+    if parquet_metadata.num_row_groups:
+        row_group = parquet_metadata.row_group(0)
+        for index in range(row_group.num_columns):
+            column = row_group.column(index)
+            written["encodings"][column.path_in_schema] = list(column.encodings)
+        written["compression"] = row_group.column(0).compression
+    return written
+
+def write_arrow_file(tables, output_file, schema, row_group_size):
+    
+    # Arrow IPC file, left uncompressed so that readers can memory-map it and use the columns
+    # without decoding or copying them. An IPC file holds a single dictionary per column, while
+    # each batch builds its own, so dictionary columns (e.g. change_type) are written plain.
+    file_schema = pa.schema([pa.field(field.name, field.type.value_type) if pa.types.is_dictionary(field.type)
+                             else field for field in schema])
+    
+    # Tables already read from an earlier file of the same name still point into its mapping,
+    # so the new file is written aside and swapped in rather than truncating the old one
+    temp_file = f"{output_file}.tmp"
+    record_count = 0
+    try:
+        with pa.ipc.new_file(temp_file, file_schema) as writer:
+            for table in tables:
+                if table.schema != file_schema:
+                    table = table.cast(file_schema)
+                writer.write_table(table, max_chunksize=row_group_size)
+                record_count += table.num_rows
+        with pa.memory_map(temp_file, 'r') as source:
+            record_batches = pa.ipc.open_file(source).num_record_batches
+        os.replace(temp_file, output_file)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    return {
+        "record_count": record_count,
+        "file_size_bytes": os.path.getsize(output_file),
+        "compression": "UNCOMPRESSED",
+        "row_groups": record_batches,
+        "output_format": "arrow"
     }
+
+def write_partitioned_dataset(tables, output_dir, schema, partition_cols, compression, row_group_size,
+                              page_dictionary_columns):
+    
+    # run_date is derived from the processing date; every other partition column must exist in the data
+    run_date = datetime.now().date().isoformat()
+    if "run_date" in partition_cols:
+        schema = schema.append(pa.field("run_date", pa.string()))
+    missing = [column for column in partition_cols if column not in schema.names]
+    if missing:
+        raise ValueError(f"Unknown partition columns: {missing}")
+    sort_keys = [(column, "ascending") for column in partition_cols if column != "run_date"]
+    sort_keys.append(("employee_id", "ascending"))
+    
+    def record_batches():
+        # Sorting each batch by partition keys and employee_id keeps row groups contiguous, so
+        # their min/max statistics are tight enough for readers to skip them
+        for table in tables:
+            if "run_date" in partition_cols:
+                table = table.append_column("run_date", pa.array([run_date] * table.num_rows, pa.string()))
+            keys = pa.table({
+                column: pc.cast(table[column], pa.string()) if pa.types.is_dictionary(table.schema.field(column).type)
+                else table[column]
+                for column, _ in sort_keys
+            })
+            yield from table.take(pc.sort_indices(keys, sort_keys=sort_keys)).to_batches()
+    
+    # The directory belongs to this output file; partitions from an earlier run of the same name
+    # would otherwise stay behind next to the new ones
+    if os.path.isdir(output_dir):
+        shutil.rmtree(output_dir)
+    
+    # max_rows_per_group only splits large batches. A minimum would make the writer hold up to
+    # row_group_size rows for every open partition at once.
+    written_files = []
+    file_options = ds.ParquetFileFormat().make_write_options(
+        compression=compression,
+        use_dictionary=[column for column in page_dictionary_columns if column not in partition_cols] or False,
+        write_statistics=True
+    )
+    ds.write_dataset(
+        record_batches(),
+        output_dir,
+        schema=schema,
+        format="parquet",
+        file_options=file_options,
+        partitioning=ds.partitioning(pa.schema([schema.field(column) for column in partition_cols]), flavor="hive"),
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        max_rows_per_group=row_group_size,
+        file_visitor=written_files.append
+    )
+    
+    # Per-partition row counts come straight from the footers of the files just written
+    partitions = {}
+    for written_file in written_files:
+        partition_path = os.path.relpath(os.path.dirname(written_file.path), output_dir)
+        partition = partitions.setdefault(partition_path, {"path": partition_path, "row_count": 0, "files": 0})
+        partition["row_count"] += written_file.metadata.num_rows
+        partition["files"] += 1
+    
+    return {
+        "record_count": sum(written_file.metadata.num_rows for written_file in written_files),
+        "columns": [column for column in schema.names if column not in partition_cols],
+        "file_size_bytes": sum(os.path.getsize(written_file.path) for written_file in written_files),
+        "row_groups": sum(written_file.metadata.num_row_groups for written_file in written_files),
+        "statistics": True,
+        "partitioning": {"flavor": "hive", "columns": partition_cols},
+        "partitions": sorted(partitions.values(), key=lambda partition: partition["path"])
+    }
+
+def transform_and_save_sharded(employees, output_dir, scraper_config, stats=None):
+    
+    workers = scraper_config["workers"]
+    stats = stats or RunStats()
+    if fingerprint_index_path(scraper_config):
+        raise ValueError("Delta mode cannot be combined with sharded workers")
+    if scraper_config.get("dedup"):
+        raise ValueError("Dedup mode cannot be combined with sharded workers")
+    if scraper_config.get("sink"):
+        raise ValueError("A SQL sink cannot be combined with sharded workers")
+    if scraper_config.get("partition_cols"):
+        raise ValueError("partition_cols cannot be combined with sharded workers")
+    if output_format(scraper_config) != "parquet":
+        raise ValueError("Arrow output cannot be combined with sharded workers")
+    
+    # Shards need random access, so a streamed input is collected first
+    if not isinstance(employees, list):
+        with stats.stage("parse", exclude=("fetch",)):
+            employees = list(employees)
+    shard_size = scraper_config.get("shard_size") or max(1, -(-len(employees) // workers))
+    shards = [(start, min(start + shard_size, len(employees))) for start in range(0, len(employees), shard_size)] or [(0, 0)]
+    
+    # Start from an empty dataset directory so parts from an earlier attempt are not mixed in
+    os.makedirs(output_dir, exist_ok=True)
+    for stale_part in glob.glob(os.path.join(output_dir, "part-*.parquet")):
+        os.remove(stale_part)
+    
+    # Forked workers read their slice of the inherited list; other platforms pickle each shard.
+    # Forking while other threads run (a batch run, a pipeline) can copy a lock another thread
+    # holds into the child and deadlock it, so then the workers are started fresh instead.
+    global _shard_source
+    start_methods = multiprocessing.get_all_start_methods()
+    use_fork = "fork" in start_methods and threading.active_count() == 1
+    start_method = "fork" if use_fork else ("forkserver" if "forkserver" in start_methods else None)
+    shard_config = dict(scraper_config, workers=1)
+    _shard_source = employees if use_fork else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as executor:
+            futures = []
+            for index, (start, end) in enumerate(shards):
+                part_file = os.path.join(output_dir, f"part-{index:05d}.parquet")
+                shard = None if use_fork else employees[start:end]
+                futures.append(executor.submit(transform_shard, start, end, part_file, shard_config, shard))
+            parts = [future.result() for future in futures]
+    finally:
+        _shard_source = None
+    
+    # Worker stage times add up across processes, like the stages of a pipelined run
+    for part in parts:
+        stats.merge(part.pop("stats"))
+    
+    # Merge the per-part metadata into the same shape as a single-file run
+    return {
+        "processed_at": datetime.now().isoformat(),
+        "record_count": sum(part["record_count"] for part in parts),
+        "columns": parts[0]["columns"],
+        "output_file": output_dir,
+        "file_size_bytes": sum(part["file_size_bytes"] for part in parts),
+        "compression": parts[0]["compression"],
+        "row_group_size": parts[0]["row_group_size"],
+        "row_groups": sum(part["row_groups"] for part in parts),
+        "dictionary_columns": parts[0]["dictionary_columns"],
+        "encodings": parts[0]["encodings"],
+        "workers": workers,
+        "parts": [
+            {
+                "output_file": part["output_file"],
+                "record_count": part["record_count"],
+                "file_size_bytes": part["file_size_bytes"]
+            }
+            for part in parts
+        ]
+    }
+
+def transform_shard(start, end, part_file, scraper_config, shard=None):
+    
+    # Runs in a worker process, so its stats travel back with the part metadata
+    if shard is None:
+        shard = _shard_source[start:end]
+    stats = RunStats()
+    metadata = transform_records_and_save_to_parquet(shard, part_file, scraper_config, stats)
+    metadata["stats"] = stats.as_dict()
+    return metadata
+
+def delta_table(table, tracker):
+    
+    # Serialise every transformed row in one Arrow call, fingerprint it, and keep only
+    # inserts/updates tagged with their change type
+    columns = [pc.cast(column, pa.string()) for column in table.columns]
+    row_texts = pc.binary_join_element_wise(*columns, "\x1f").to_pylist()
+    fingerprints = [fingerprint_text(text) for text in row_texts]
+    change_types = tracker.classify(table["employee_id"].to_pylist(), fingerprints)
+    changed = table.filter(pa.array([change_type is not None for change_type in change_types], type=pa.bool_()))
+    change_column = pa.array([change_type for change_type in change_types if change_type], type=pa.string())
+    return changed.append_column("change_type", change_column.dictionary_encode())
+
+def dedup_table(table, dedup, stats):
+    
+    # Look up one batch of keys in the on-disk index, keep the new rows and count the checks
+    if not table.num_rows:
+        return table
+    keep = dedup.apply({key: table[key].to_pylist() for key in dedup.keys}, stats)
+    if not all(keep):
+        table = table.filter(pa.array(keep))
+    dedup.add_checks(table_checks(table))
+    return table
+
+def table_checks(table):
+    
+    # Same counts as dedup.record_checks, computed column-wise
+    def count(column, value):
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        return pc.sum(pc.equal(column, value)).as_py() or 0
+    
+    checks = {
+        "missing_employee_id": count(table["employee_id"], MISSING_EMPLOYEE_ID),
+        "invalid_phone": count(table["phone"], "Invalid Number"),
+        "missing_email": count(table["email"], ""),
+        "missing_full_name": count(table["full_name"], ""),
+        "zero_age": count(table["age"], 0),
+        "zero_years_of_experience": count(table["years_of_experience"], 0),
+        "zero_salary": count(table["salary"], 0)
+    }
+    return {check: checks[check] for check in VALIDATION_CHECKS}
+
+def deleted_rows_table(deleted_ids, schema):
+    
+    # Deleted employees carry only their id and change type; every other column is null
+    arrays = []
+    for field in schema:
+        if field.name == "employee_id":
+            arrays.append(pa.array(deleted_ids, type=field.type))
+        elif field.name == "change_type":
+            arrays.append(pa.array([DELETE] * len(deleted_ids), type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.nulls(len(deleted_ids), type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def employee_schema(dictionary_columns):
+    
+    # Low-cardinality string columns are carried as dictionary arrays end to end
+    fields = []
+    for name, type_name in EMPLOYEE_COLUMNS:
+        column_type = pa.type_for_alias(type_name)
+        if name in dictionary_columns:
+            column_type = pa.dictionary(pa.int32(), column_type)
+        fields.append(pa.field(name, column_type))
+    return pa.schema(fields)
+
+def transform_employee_batch(employees, schema, field_mapping=None, stats=None):
+    
+    # Resolve the field mapping against the first record, then fetch every field of a record
+    # with one itemgetter call and transpose the rows into source columns
+    mapping = resolve_field_mapping(field_mapping)
+    source = {field: () for field in mapping}
+    if employees:
+        plan = FieldPlan(mapping, employees[0])
+        source = dict(zip(plan.fields, zip(*plan.extract_rows(employees))))
+    
+    def parse_int(field):
+        parse = float if mapping[field]["type"] == "float_int" else int
+        return to_int_column(source[field], parse)
+    
+    employee_id, bad = parse_int("employee_id")
+    age, bad_age = parse_int("age")
+    years_of_experience, bad_experience = parse_int("years_of_experience")
+    salary, bad_salary = parse_int("salary")
+    
+    # Rows that would have raised ValueError/TypeError in any conversion are skipped and
+    # counted under the first field that failed, in field mapping order
+    stats = stats or RunStats()
+    stats.count("records_in", len(employees))
+    if bad.any():
+        stats.skip("invalid_employee_id", int(bad.sum()))
+    for field, field_bad in (("age", bad_age), ("years_of_experience", bad_experience), ("salary", bad_salary)):
+        newly_bad = field_bad & ~bad
+        if newly_bad.any():
+            stats.skip(f"invalid_{field}", int(newly_bad.sum()))
+        bad |= field_bad
+    skipped = int(bad.sum())
+    if skipped:
+        print(f"Skipped {skipped} invalid employee records")
+    keep = ~bad
+    keep_mask = pa.array(keep)
+    
+    def string_column(values):
+        values = pa.array(list(map(str, values)), type=pa.string())
+        return values.filter(keep_mask) if skipped else values
+    
+    def int_column(values):
+        return pa.array(values[keep].astype(np.int32))
+    
+    first_name = string_column(source["first_name"])
+    last_name = string_column(source["last_name"])
+    phone = string_column(source["phone"])
+    years_of_experience = years_of_experience[keep]
+    
+    # Designation bins: <3, 3-5, 6-10, 10+ years of experience, built directly as dictionary codes
+    designation_codes = np.select(
+        [years_of_experience < 3, years_of_experience <= 5, years_of_experience <= 10],
+        [0, 1, 2],
+        3
+    ).astype(np.int32)
+    designation = pa.DictionaryArray.from_arrays(designation_codes, pa.array(DESIGNATION_LABELS))
+    
+    # Phone numbers containing an 'x' extension are invalid
+    phone_valid = pc.invert(pc.match_substring(phone, "x"))
+    
+    columns = {
+        "employee_id": int_column(employee_id),
+        "full_name": pc.utf8_trim_whitespace(pc.binary_join_element_wise(first_name, last_name, " ")),
+        "email": string_column(source["email"]),
+        "phone": pc.if_else(phone_valid, phone, "Invalid Number"),
+        "gender": string_column(source["gender"]),
+        "age": int_column(age),
+        "job_title": string_column(source["job_title"]),
+        "years_of_experience": pa.array(years_of_experience.astype(np.int32)),
+        "salary": int_column(salary),
+        "department": string_column(source["department"]),
+        "designation": designation,
+        "phone_valid": phone_valid
+    }
+    
+    # Match each column to the schema: dictionary-encode or decode as configured
+    arrays = []
+    for field in schema:
+        column = columns[field.name]
+        if pa.types.is_dictionary(field.type) and not pa.types.is_dictionary(column.type):
+            column = column.dictionary_encode()
+        elif not pa.types.is_dictionary(field.type) and pa.types.is_dictionary(column.type):
+            column = column.dictionary_decode()
+        arrays.append(column)
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def to_int_column(values, parse):
+    
+    # Convert a whole column in one call; numpy applies int() per value so semantics match.
+    # Only a column that contains bad rows falls back to checking each value on its own. A
+    # batch whose values are all equal-length lists converts to a 2-D array, so it falls back too.
+    bad = np.zeros(len(values), dtype=bool)
+    try:
+        if parse is float:
+            parsed = np.array(values, dtype=np.float64)
+            if parsed.ndim == 1:
+                # NaN, infinities and anything outside int64 are invalid (NaN fails both comparisons)
+                bad = ~((parsed >= -INT64_LIMIT) & (parsed < INT64_LIMIT))
+                return np.where(bad, 0, parsed).astype(np.int64), bad
+        else:
+            parsed = np.array(values, dtype=np.int64)
+            if parsed.ndim == 1:
+                return parsed, bad
+    except (ValueError, TypeError, OverflowError):
+        pass
+    
+    converted = np.zeros(len(values), dtype=np.int64)
+    for index, value in enumerate(values):
+        try:
+            converted[index] = int(parse(value))
+        except (ValueError, TypeError, OverflowError):
+            bad[index] = True
+    return converted, bad
@@ -1,6 +1,14 @@
-import json
-import os
-from lamda.process.parquet_processor import process_employee_data
+import sys
+from lamda.process.batch import DEFAULT_MAX_PER_HOST, DEFAULT_MAX_WORKERS, batch_response, run_batch, select_scrapers
+from lamda.process.config_cache import get_scraper_config as load_scraper_config, list_scraper_configs
+from lamda.process.instrumentation import RunStats, log_stats
+from lamda.process.lazy_import import LazyModule
+from lamda.process.retry import invocation_deadline
+from lamda.process.scheduler import run_scheduler
+from lamda.process.parquet_processor import output_extension, process_employee_data
+
+# Loaded only by invocations that ask for a profile
+profiling = LazyModule("lamda.process.profiling")
 
 def lambdaHandler(event, context):
    
@@ -24,42 +32,94 @@ def lambdaHandler(event, context):
                 "body": f"Scraper configuration not found for: {scraper_name}"
             }
         
-        # Process the employee data and save to Parquet
-        output_file = f"{scraper_name}_{run_scraper_id}.parquet"
-        result = process_employee_data(scraper_config, output_file)
+        # Profiling is opt-in per invocation; without the flag the profiler is never even imported
+        if scraper_input.get("profile", False):
+            return profiling.run_profiled(run_scraper, scraper_config, run_scraper_id, context,
+                                          scraper_input.get("profile_top_n", profiling.DEFAULT_TOP_N))
+        
+        return run_scraper(scraper_config, run_scraper_id, context)
         
+    except Exception as e:
+        print(f"Error in lambdaHandler: {str(e)}")
+        return {
+            "statusCode": 500,
+            "body": f"Error processing request: {str(e)}"
+        }
+
+def run_scraper(scraper_config, run_scraper_id, context=None):
+    
+    # Process the employee data and save to Parquet, or to an Arrow file when configured
+    output_file = f"{scraper_config['scraper_name']}_{run_scraper_id}{output_extension(scraper_config)}"
+    stats = RunStats()
+    # Retries give up early rather than run into the Lambda timeout
+    deadline = invocation_deadline(context, scraper_config)
+    result = process_employee_data(scraper_config, output_file, stats, deadline)
+    result["metadata"]["stats"] = stats.as_dict()
+    
+    # Upstream data is unchanged since the last run, so its output file is still current
+    if result["metadata"].get("cache_hit"):
+        log_stats(scraper_config, result["metadata"]["stats"], run_scraper_id=run_scraper_id, cache_hit=True)
         return {
             "statusCode": 200,
-            "body": f"Successfully processed employee data. Output saved to {output_file}",
+            "body": f"Upstream data unchanged. Reusing output {result['metadata']['output_file']}",
+            "cache_hit": True,
             "metadata": result["metadata"]
         }
-        
+    
+    log_stats(scraper_config, result["metadata"]["stats"], run_scraper_id=run_scraper_id, cache_hit=False)
+    return {
+        "statusCode": 200,
+        "body": f"Successfully processed employee data. Output saved to {output_file}",
+        "cache_hit": False,
+        "metadata": result["metadata"]
+    }
+
+def batchHandler(event, context):
+    
+    # Run several scrapers in one invocation: every enabled scraper, or the ones named in
+    # scraper_names, all under the same run_scraper_id
+    scraper_input = event.get("scraper_input", {})
+    run_scraper_id = scraper_input.get("run_scraper_id")
+    if not run_scraper_id:
+        return {
+            "statusCode": 400,
+            "body": "Missing required parameter: run_scraper_id"
+        }
+    
+    try:
+        scraper_configs, skipped = select_scrapers(list_scraper_configs(), scraper_input.get("scraper_names"))
     except Exception as e:
-        print(f"Error in lambdaHandler: {str(e)}")
+        print(f"Error loading scraper configuration: {str(e)}")
         return {
             "statusCode": 500,
-            "body": f"Error processing request: {str(e)}"
+            "body": f"Error loading scraper configuration: {str(e)}"
         }
+    
+    results, elapsed_seconds = run_batch(
+        scraper_configs,
+        lambda scraper_config: run_scraper(scraper_config, run_scraper_id, context),
+        scraper_input.get("max_workers", DEFAULT_MAX_WORKERS),
+        scraper_input.get("max_per_host", DEFAULT_MAX_PER_HOST)
+    )
+    return batch_response(results, skipped, elapsed_seconds)
 
 def get_scraper_config(scraper_name):
   
     try:
-        # Load the scraper configuration from run_scraper.json
-        with open('run_scraper.json', 'r') as config_file:
-            scrapers = json.load(config_file)
-        
-        # Find the matching scraper configuration
-        for scraper in scrapers:
-            if scraper.get("scraper_name") == scraper_name:
-                return scraper
-        
-        return None
+        # Look up the scraper in run_scraper.json; the parsed file is cached across warm
+        # invocations and only re-read when it changes
+        return load_scraper_config(scraper_name)
     
     except Exception as e:
         print(f"Error loading scraper configuration: {str(e)}")
         return None
 
 if __name__ == "__main__":
+    # python process_main.py --schedule keeps running and starts each scraper by its "frequency"
+    if "--schedule" in sys.argv:
+        run_scheduler(run_scraper)
+        sys.exit(0)
+    
     # For local testing, create a test input
     inputData = {
         "scraper_input": {